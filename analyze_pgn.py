@@ -0,0 +1,158 @@
+# Runs the minimax bot's search over every position of the games in PGN files, for example:
+#   python analyze_pgn.py games.pgn --output analysis.jsonl --depth 4 --workers 8
+#   python analyze_pgn.py games.pgn --output annotated.pgn --format pgn --nodes 20000
+# Games are read one at a time and their positions searched in a process pool, with only a
+# few games in flight at once, so memory stays flat however big the archive is. Results are
+# written game by game in input order, and a checkpoint file records how many games are done:
+# run again with --resume to carry on after an interruption.
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import chess.pgn
+
+from realistic_bot import search, tablebase
+
+def init_worker():
+    # Book moves come without a search, the analysis wants the engine's own score
+    search.USE_BOOK = False
+
+def white_score(value, pv):
+    # Search score as {"cp": ...} or {"mate": ...}, from White's point of view
+    if abs(value) == float('inf'):
+        moves_to_mate = (len(pv) + 1) // 2
+        return {"mate": moves_to_mate if value > 0 else -moves_to_mate}
+    if abs(value) > tablebase.TABLEBASE_BOUND:
+        # Tablebase scores count the plies to mate from the searched position
+        moves_to_mate = (tablebase.TABLEBASE_WIN - abs(value) + 1) // 2
+        return {"mate": moves_to_mate if value > 0 else -moves_to_mate}
+    return {"cp": int(value)}
+
+def analyze_position(task):
+    # Runs in a worker process: search one position and return what the last iteration found
+    fen, depth, time_limit, node_limit = task
+    board = chess.Board(fen)
+    result = {}
+
+    def record(current_depth, best_move, best_value, pv):
+        result.update(depth=current_depth, best=best_move.uci(), pv=[move.uci() for move in pv],
+                      **white_score(best_value, pv))
+
+    search.engine_move_choice(board, board.turn, depth=depth, time_limit=time_limit, node_limit=node_limit,
+                              on_iteration=record)
+    result["nodes"] = search.search_nodes + search.quiescence_nodes
+    return result
+
+def game_tasks(game, options):
+    # One task per position where a move was played
+    tasks = []
+    board = game.board()
+    for move in game.mainline_moves():
+        tasks.append((board.fen(), options["depth"], options["movetime"], options["nodes"]))
+        board.push(move)
+    return tasks
+
+def format_eval(analysis):
+    if "mate" in analysis:
+        return f"#{analysis['mate']}"
+    return f"{analysis['cp'] / 100:.2f}"
+
+def write_game(output, output_format, index, game, analyses):
+    if output_format == "jsonl":
+        positions = []
+        for node, analysis in zip(game.mainline(), analyses):
+            positions.append({"ply": node.ply() - 1, "move": node.move.uci(), **analysis})
+        output.write(json.dumps({"game": index, "headers": dict(game.headers), "positions": positions}) + "\n")
+    else:
+        # The evaluation of the position before each move, and the move the bot would have played
+        for node, analysis in zip(game.mainline(), analyses):
+            node.comment = f"[%eval {format_eval(analysis)}] best {analysis['best']}"
+        output.write(str(game) + "\n\n")
+    output.flush()
+
+def read_checkpoint(path):
+    # (games finished, size of the output file when the last of them was written)
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+        return checkpoint["games"], checkpoint["offset"]
+    except (OSError, ValueError, KeyError):
+        return 0, 0
+
+def write_checkpoint(path, games, offset):
+    # Written to a temporary file and renamed, so a crash never leaves half a checkpoint
+    with open(path + ".tmp", "w") as f:
+        json.dump({"games": games, "offset": offset}, f)
+    os.replace(path + ".tmp", path)
+
+def read_games(paths, skip):
+    # Yields (index, game) for every game in the files, after skipping the first skip games
+    index = 0
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as pgn:
+            while True:
+                if index < skip:
+                    if not chess.pgn.skip_game(pgn):
+                        break
+                    index += 1
+                    continue
+                game = chess.pgn.read_game(pgn)
+                if game is None:
+                    break
+                yield index, game
+                index += 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze the positions of PGN games with the minimax bot.")
+    parser.add_argument("pgn", nargs="+")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--format", choices=["jsonl", "pgn"], default="jsonl")
+    parser.add_argument("--depth", type=int, default=3, help="search depth per position")
+    parser.add_argument("--movetime", type=float, default=None, help="seconds per position")
+    parser.add_argument("--nodes", type=int, default=None, help="nodes per position")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--checkpoint", default=None, help="default: the output file with .checkpoint added")
+    parser.add_argument("--resume", action="store_true", help="skip the games a previous run finished")
+    args = parser.parse_args()
+
+    options = {"depth": args.depth, "movetime": args.movetime, "nodes": args.nodes}
+    checkpoint = args.checkpoint or args.output + ".checkpoint"
+    done, offset = read_checkpoint(checkpoint) if args.resume else (0, 0)
+    workers = args.workers or os.cpu_count() or 1
+    # Enough games in flight to keep every worker busy between games, and no more
+    max_pending = workers * 2
+    positions = 0
+    start = time.monotonic()
+    with open(args.output, "a" if args.resume else "w") as output, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        # Drop anything written after the checkpoint, it is done again
+        output.truncate(offset)
+        pending = deque()
+
+        def finish_oldest():
+            nonlocal done, positions
+            index, game, futures = pending.popleft()
+            analyses = [future.result() for future in futures]
+            write_game(output, args.format, index, game, analyses)
+            done = index + 1
+            positions += len(analyses)
+            write_checkpoint(checkpoint, done, output.tell())
+
+        for index, game in read_games(args.pgn, done):
+            futures = [pool.submit(analyze_position, task) for task in game_tasks(game, options)]
+            pending.append((index, game, futures))
+            while len(pending) > max_pending:
+                finish_oldest()
+        while pending:
+            finish_oldest()
+    elapsed = time.monotonic() - start
+    print(f"{done} games, {positions} positions in {elapsed:.1f}s "
+          f"({positions / elapsed if elapsed else 0:.1f} positions/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# The window, drawing, prompts and input shared by the pygame front ends (minimax_chess.py
+# and complex_chess.py). pygame is imported and the window opened on first use, the piece
+# sprites are loaded once into an atlas, and fonts and rendered messages are cached, so a new
+# game doesn't reload anything. The board is drawn once onto a background surface; after that
+# only the squares whose piece or highlight changed are redrawn and pushed to the window, and
+# the loops wait for events at a capped frame rate instead of spinning, so the engine's search
+# gets the CPU.
+import contextlib
+import io
+
+import chess
+
+# pygame is only imported once the window is opened, so the front ends can be imported without it
+pygame = None
+screen = None
+renderer = None
+piece_atlas = None
+fonts = {}
+messages = {}
+
+def load_pygame():
+    global pygame
+    if pygame is None:
+        # Redirecting stdout is just to suppress pygame startup message
+        with contextlib.redirect_stdout(io.StringIO()):
+            import pygame
+        # Initialize pygame
+        pygame.init()
+    return pygame
+
+# Constants
+SIDE_LENGTH = 640
+SQUARE_SIZE = SIDE_LENGTH // 8
+# Most frames per second the front ends draw while something is going on
+FPS = 30
+
+# Colors
+WHITE = (238, 238, 210)
+BROWN = (118, 150, 86)
+HIGHLIGHT = (186, 202, 68)
+
+# Sprite file in Assets/ for each piece symbol
+PIECE_FILES = {
+    'p': 'p', 'n': 'n', 'b': 'b', 'r': 'r', 'q': 'q', 'k': 'k',
+    'P': 'wp', 'N': 'wn', 'B': 'wb', 'R': 'wr', 'Q': 'wq', 'K': 'wk',
+}
+
+def open_window():
+    # Opens the window the first time, later calls return the same one
+    global screen, renderer
+    if screen is None:
+        load_pygame()
+        screen = pygame.display.set_mode((SIDE_LENGTH, SIDE_LENGTH))
+        pygame.display.set_caption('Chess Board')
+        renderer = BoardRenderer(screen, load_piece_atlas())
+    return screen
+
+def load_piece_atlas():
+    # All twelve sprites scaled once into a single surface, with the area of each piece in it
+    global piece_atlas
+    if piece_atlas is None:
+        atlas = pygame.Surface((SQUARE_SIZE * len(PIECE_FILES), SQUARE_SIZE), pygame.SRCALPHA)
+        areas = {}
+        for index, (symbol, file_name) in enumerate(PIECE_FILES.items()):
+            sprite = pygame.transform.scale(pygame.image.load(f"Assets/{file_name}.png").convert_alpha(), (SQUARE_SIZE, SQUARE_SIZE))
+            areas[symbol] = pygame.Rect(index * SQUARE_SIZE, 0, SQUARE_SIZE, SQUARE_SIZE)
+            atlas.blit(sprite, areas[symbol])
+        piece_atlas = atlas.convert_alpha(), areas
+    return piece_atlas
+
+def get_font(size):
+    font = fonts.get(size)
+    if font is None:
+        font = fonts[size] = pygame.font.SysFont('Arial', size)
+    return font
+
+def square_rect(square):
+    return pygame.Rect(chess.square_file(square) * SQUARE_SIZE, (7 - chess.square_rank(square)) * SQUARE_SIZE,
+                       SQUARE_SIZE, SQUARE_SIZE)
+
+def render_background():
+    background = pygame.Surface((SIDE_LENGTH, SIDE_LENGTH))
+    for row in range(8):
+        for col in range(8):
+            color = WHITE if (row + col) % 2 == 0 else BROWN
+            pygame.draw.rect(background, color, pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+    return background
+
+class BoardRenderer:
+    # Keeps track of what is on screen, so draw() only touches the squares that changed
+    def __init__(self, screen, atlas):
+        self.screen = screen
+        self.atlas, self.piece_areas = atlas
+        self.background = render_background()
+        self.shown = {}
+        self.shown_selection = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        # Something else (a message) was drawn over the board, redraw all of it next time
+        self.full_redraw = True
+
+    def draw(self, board, selected_square=None):
+        piece_map = {square: piece.symbol() for square, piece in board.piece_map().items()}
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            changed = set(piece_map)
+        else:
+            changed = {square for square in set(piece_map) | set(self.shown) if piece_map.get(square) != self.shown.get(square)}
+            if selected_square != self.shown_selection:
+                changed |= {square for square in (selected_square, self.shown_selection) if square is not None}
+        rects = []
+        for square in changed:
+            rect = square_rect(square)
+            self.screen.blit(self.background, rect, rect)
+            if square in piece_map:
+                self.screen.blit(self.atlas, rect, self.piece_areas[piece_map[square]])
+            if square == selected_square:
+                pygame.draw.rect(self.screen, HIGHLIGHT, rect, 3)
+            rects.append(rect)
+        if self.full_redraw:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.shown = piece_map
+        self.shown_selection = selected_square
+        self.full_redraw = False
+
+def next_events(clock, busy):
+    # Waits for input and returns the pending events. While busy (an engine is thinking) it
+    # only waits until the next frame, so the caller can check on the engine at FPS.
+    if busy:
+        clock.tick(FPS)
+        return pygame.event.get()
+    return [pygame.event.wait()] + pygame.event.get()
+
+def wait_for_key(keys):
+    # Sleeps until one of keys (lower case characters) is pressed and returns it
+    while True:
+        event = pygame.event.wait()
+        if event.type == pygame.KEYDOWN and event.unicode.lower() in keys:
+            return event.unicode.lower()
+
+def draw_board(board, selected_square=None):
+    renderer.draw(board, selected_square)
+
+def display_message(text, font_size):
+    message = messages.get((text, font_size))
+    if message is None:
+        message = messages[text, font_size] = get_font(font_size).render(text, True, (255, 255, 255), (0, 0, 0))
+    rect = message.get_rect(center=(SIDE_LENGTH // 2, SIDE_LENGTH // 2))
+    screen.blit(message, rect)
+    pygame.display.flip()
+    renderer.invalidate()
+
+def choose_promotion():
+    display_message("Press Q (Queen), R (Rook), B (Bishop), or N (Knight)", 18)
+    promotion = wait_for_key(['q', 'r', 'b', 'n'])
+    return {'q': chess.QUEEN, 'r': chess.ROOK, 'b': chess.BISHOP, 'n': chess.KNIGHT}[promotion]
+
+def start_game():
+    # Shows a new board, asks the user for their color and returns (color, board)
+    open_window()
+    board = chess.Board()
+    renderer.invalidate()
+    renderer.draw(board)
+    display_message("What color do you want to play? w (White) b (Black)", 27)
+    user = wait_for_key(['w', 'b'])
+    return {'w': chess.WHITE, 'b': chess.BLACK}[user], board
+
+def user_move_choice(board, event, selected_square):
+    move = None
+    file, rank = pygame.mouse.get_pos()[0] // SQUARE_SIZE, pygame.mouse.get_pos()[1] // SQUARE_SIZE
+    clicked_square = chess.square(file, 7 - rank)
+
+    if selected_square is None:
+        selected_square = clicked_square if board.piece_at(clicked_square) else None
+    else:
+        move = chess.Move(selected_square, clicked_square)
+
+        # Castling handling
+        if board.piece_at(selected_square).piece_type == chess.KING and abs(chess.square_file(selected_square) - chess.square_file(clicked_square)) > 1:
+            if chess.square_file(clicked_square) == 6:
+                move = chess.Move(selected_square, chess.square(6, chess.square_rank(selected_square)))
+            elif chess.square_file(clicked_square) == 2:
+                move = chess.Move(selected_square, chess.square(2, chess.square_rank(selected_square)))
+
+        # Pawn Promotion handling
+        is_promotion = board.piece_at(selected_square).piece_type == chess.PAWN and chess.square_rank(clicked_square) in [0, 7]
+        if is_promotion:
+            possible_promos = [chess.Move(selected_square, clicked_square, p) for p in [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]]
+            legal_promos = [m for m in possible_promos if m in board.legal_moves]
+            if legal_promos:
+                promo_choice = choose_promotion()
+                move = chess.Move(selected_square, clicked_square, promotion=promo_choice)
+
+        if move not in board.legal_moves:
+            move = None
+        selected_square = None
+
+    return move, selected_square
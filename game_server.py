@@ -0,0 +1,348 @@
+# Hosts games against the minimax bot over HTTP, so many players can play at once:
+#   python game_server.py --port 8080 --workers 8
+# The server is a single asyncio event loop holding every game in memory; the bot's searches
+# run in a pool of worker processes. Requests and responses are JSON:
+#   POST   /games               {"color": "white"|"black"|"random", "depth": 4, "movetime": 1.0}
+#                               starts a game (the bot moves first if you are black)
+#   GET    /games/<id>          the game's state
+#   POST   /games/<id>/moves    {"move": "e2e4"} (UCI or SAN), answered with the bot's reply
+#   DELETE /games/<id>          ends the game
+#   GET    /stats               sessions, queue length, rejections, timeouts, move latency
+# Every bot move has a deadline of the game's movetime, counted from when the request came in:
+# time spent waiting for a worker comes out of the search. When too many searches are already
+# waiting, new moves are turned away with 503 and a Retry-After header instead of queueing
+# without limit, and a move whose search misses the deadline by more than DEADLINE_GRACE
+# gets 504. Either way the game is left as it was before the move, so the client can retry.
+# See load_test.py to try it with many simulated players.
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import chess
+
+from realistic_bot import search
+from realistic_bot.latency import percentile
+
+DEFAULT_DEPTH = 4
+MAX_DEPTH = 8
+# Seconds per bot move, a game can ask for less but not more
+DEFAULT_MOVETIME = 1.0
+MAX_MOVETIME = 10.0
+# engine_move_choice() always finishes depth 1 and only checks the clock every 1024 nodes,
+# so a search can overshoot its time limit a little
+DEADLINE_GRACE = 2.0
+# Searches that may wait for a worker, per worker, before new ones get 503
+QUEUE_PER_WORKER = 4
+RETRY_AFTER = 1
+# Games nobody has touched for this long are dropped
+SESSION_TIMEOUT = 30 * 60
+MAX_SESSIONS = 10000
+# Connections idle for this long between requests are closed
+IDLE_CONNECTION_TIMEOUT = 60
+MAX_BODY = 64 * 1024
+# Bot move latencies kept for /stats
+LATENCY_SAMPLES = 10000
+
+class HttpError(Exception):
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+def init_worker():
+    # Forked workers start with the same random state, so they would all add the same noise
+    random.seed()
+
+def search_move(board, depth, time_limit):
+    # Runs in a worker process: the bot's move in this position, as (uci, nodes searched)
+    move = search.engine_move_choice(board, board.turn, depth=depth, time_limit=time_limit)
+    return move.uci(), search.search_nodes + search.quiescence_nodes
+
+class Game:
+    def __init__(self, player_color, depth, movetime):
+        self.id = secrets.token_hex(8)
+        self.board = chess.Board()
+        self.player_color = player_color
+        self.depth = depth
+        self.movetime = movetime
+        # One move at a time per game, a second request waits for the first
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+    def state(self):
+        board = self.board
+        return {
+            "id": self.id,
+            "fen": board.fen(),
+            "moves": [move.uci() for move in board.move_stack],
+            "player": "white" if self.player_color == chess.WHITE else "black",
+            "turn": "white" if board.turn == chess.WHITE else "black",
+            "legal_moves": [move.uci() for move in board.legal_moves],
+            "result": board.result() if board.is_game_over() else None,
+        }
+
+def parse_options(body):
+    # (player color, depth, movetime) for a new game
+    color = body.get("color", "random")
+    if color == "random":
+        color = random.choice(["white", "black"])
+    if color not in ("white", "black"):
+        raise HttpError(400, "color must be white, black or random")
+    try:
+        depth = int(body.get("depth", DEFAULT_DEPTH))
+        movetime = float(body.get("movetime", DEFAULT_MOVETIME))
+    except (TypeError, ValueError):
+        raise HttpError(400, "depth and movetime must be numbers")
+    if not 1 <= depth <= MAX_DEPTH or not 0 < movetime <= MAX_MOVETIME:
+        raise HttpError(400, f"depth must be 1 to {MAX_DEPTH} and movetime above 0 and at most {MAX_MOVETIME}")
+    return chess.WHITE if color == "white" else chess.BLACK, depth, movetime
+
+def parse_move(board, text):
+    try:
+        return board.parse_uci(text)
+    except ValueError:
+        pass
+    try:
+        return board.parse_san(text)
+    except ValueError:
+        raise HttpError(400, f"illegal move: {text}")
+
+class GameServer:
+    def __init__(self, workers=None, queue_per_worker=QUEUE_PER_WORKER):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+        # A search holds a slot from when it is sent to a worker until the worker is done with it
+        self.slots = asyncio.Semaphore(self.workers)
+        self.max_pending = self.workers * (1 + queue_per_worker)
+        # Searches running or waiting for a slot
+        self.pending = 0
+        self.games = {}
+        self.counters = {"requests": 0, "games_started": 0, "bot_moves": 0, "rejected": 0, "timeouts": 0, "nodes": 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    async def start(self, host, port):
+        self.expiry_task = asyncio.get_running_loop().create_task(self.expire_sessions())
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def expire_sessions(self):
+        while True:
+            await asyncio.sleep(60)
+            now = time.monotonic()
+            for game_id in [game_id for game_id, game in self.games.items() if now - game.last_active > SESSION_TIMEOUT]:
+                del self.games[game_id]
+
+    async def bot_move(self, board, game):
+        # The bot's move on board within the game's deadline. Raises HttpError 503 if the queue
+        # is full or no worker frees up in time, 504 if the search runs past the deadline.
+        start = time.monotonic()
+        deadline = start + game.movetime
+        if self.pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise HttpError(503, "server busy", retry_after=RETRY_AFTER)
+        self.pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self.slots.acquire(), game.movetime)
+            except asyncio.TimeoutError:
+                self.counters["rejected"] += 1
+                raise HttpError(503, "no worker free before the deadline", retry_after=RETRY_AFTER)
+            try:
+                future = asyncio.wrap_future(self.pool.submit(search_move, board, game.depth, max(0.0, deadline - time.monotonic())))
+            except Exception:
+                # Nothing will run, e.g. the pool broke when a worker died
+                self.slots.release()
+                raise
+            # The slot is given back when the worker is really done, even if we stopped waiting
+            future.add_done_callback(lambda _: self.slots.release())
+            try:
+                move, nodes = await asyncio.wait_for(asyncio.shield(future), deadline - time.monotonic() + DEADLINE_GRACE)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                raise HttpError(504, "the bot missed its deadline")
+        finally:
+            self.pending -= 1
+        self.counters["bot_moves"] += 1
+        self.counters["nodes"] += nodes
+        self.latencies.append(time.monotonic() - start)
+        return chess.Move.from_uci(move)
+
+    def get_game(self, game_id):
+        game = self.games.get(game_id)
+        if game is None:
+            raise HttpError(404, "no such game")
+        game.last_active = time.monotonic()
+        return game
+
+    async def new_game(self, body):
+        if len(self.games) >= MAX_SESSIONS:
+            raise HttpError(503, "too many games", retry_after=RETRY_AFTER)
+        game = Game(*parse_options(body))
+        if game.player_color == chess.BLACK:
+            game.board.push(await self.bot_move(game.board, game))
+        self.games[game.id] = game
+        self.counters["games_started"] += 1
+        return 201, game.state()
+
+    async def play_move(self, game, body):
+        async with game.lock:
+            if game.board.is_game_over():
+                raise HttpError(409, "the game is over")
+            if game.board.turn != game.player_color:
+                raise HttpError(409, "not your turn")
+            # Played on a copy, so a move the bot fails to answer leaves the game untouched
+            board = game.board.copy()
+            board.push(parse_move(board, str(body.get("move", ""))))
+            bot_move = None
+            if not board.is_game_over():
+                bot_move = await self.bot_move(board, game)
+                board.push(bot_move)
+            game.board = board
+            return 200, {**game.state(), "bot_move": bot_move.uci() if bot_move else None}
+
+    def stats(self):
+        latencies = list(self.latencies)
+        return {
+            "workers": self.workers,
+            "games": len(self.games),
+            "pending_searches": self.pending,
+            **self.counters,
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p90": percentile(latencies, 0.9),
+            "latency_p99": percentile(latencies, 0.99),
+        }
+
+    async def route(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["games"] and method == "POST":
+            return await self.new_game(body)
+        if parts == ["stats"] and method == "GET":
+            return 200, self.stats()
+        if len(parts) == 2 and parts[0] == "games":
+            if method == "GET":
+                return 200, self.get_game(parts[1]).state()
+            if method == "DELETE":
+                self.get_game(parts[1])
+                del self.games[parts[1]]
+                return 200, {"id": parts[1]}
+        if len(parts) == 3 and parts[0] == "games" and parts[2] == "moves" and method == "POST":
+            return await self.play_move(self.get_game(parts[1]), body)
+        raise HttpError(404, "not found")
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive, one request at a time per connection
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_CONNECTION_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                self.counters["requests"] += 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                extra_headers = {}
+                try:
+                    status, payload = await self.route(method, path, decode_body(body))
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if e.retry_after is not None:
+                        extra_headers["Retry-After"] = str(e.retry_after)
+                except Exception as e:
+                    status, payload = 500, {"error": repr(e)}
+                write_response(writer, status, payload, keep_alive, extra_headers)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            # The request itself couldn't be read, answer and hang up
+            write_response(writer, e.status, {"error": str(e)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down with this connection still open
+            pass
+        finally:
+            writer.close()
+
+async def read_request(reader):
+    # (method, path, headers, body) or None when the client closed the connection
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "bad request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "bad content-length")
+    if length > MAX_BODY:
+        raise HttpError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+def decode_body(body):
+    if not body:
+        return {}
+    try:
+        decoded = json.loads(body)
+    except ValueError:
+        raise HttpError(400, "body is not JSON")
+    if not isinstance(decoded, dict):
+        raise HttpError(400, "body must be a JSON object")
+    return decoded
+
+def write_response(writer, status, payload, keep_alive, extra_headers=None):
+    body = json.dumps(payload).encode()
+    lines = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+async def serve(host, port, workers, queue_per_worker):
+    server = GameServer(workers, queue_per_worker)
+    try:
+        listener = await server.start(host, port)
+        print(f"Serving on http://{host}:{port} with {server.workers} workers")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve games against the minimax bot over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="search processes (default: one per core)")
+    parser.add_argument("--queue", type=int, default=QUEUE_PER_WORKER, help="searches that may wait per worker before 503")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
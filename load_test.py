@@ -0,0 +1,127 @@
+# Simulated players for game_server.py, to see how many games a box can host:
+#   python load_test.py --players 200 --moves 20 --workers 8
+# starts a server in this process on a free port and has every player open a game and play
+# random legal moves against the bot, all at once. Point it at a running server instead with
+#   python load_test.py --port 8080 --players 200
+# Requests turned away with 503 are retried after their Retry-After, a 504 is retried at once.
+# Reports moves/s, the latency players saw per move (retries included) and how often the
+# server pushed back.
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from game_server import GameServer
+from realistic_bot.latency import percentile
+
+class Connection:
+    # One keep-alive HTTP connection, a request at a time
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        # (status, headers, decoded JSON body)
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, headers, json.loads(data) if data else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+async def request_with_retries(connection, stats, method, path, payload=None):
+    # Retries 503s and 504s until the request goes through, counting them in stats
+    while True:
+        status, headers, data = await connection.request(method, path, payload)
+        if status == 503:
+            stats["rejected"] += 1
+            await asyncio.sleep(float(headers.get("retry-after", 1)) * random.uniform(0.5, 1.5))
+        elif status == 504:
+            stats["timeouts"] += 1
+        else:
+            return status, data
+
+async def play(host, port, index, args, stats):
+    rng = random.Random(args.seed + index)
+    connection = Connection(host, port)
+    try:
+        options = {"color": rng.choice(["white", "black"]), "depth": args.depth, "movetime": args.movetime}
+        status, state = await request_with_retries(connection, stats, "POST", "/games", options)
+        if status != 201:
+            stats["errors"] += 1
+            return
+        stats["games"] += 1
+        for _ in range(args.moves):
+            if state["result"] is not None:
+                break
+            await asyncio.sleep(rng.uniform(0, args.think))
+            start = time.monotonic()
+            status, state = await request_with_retries(connection, stats, "POST", f"/games/{state['id']}/moves",
+                                                       {"move": rng.choice(state["legal_moves"])})
+            if status != 200:
+                stats["errors"] += 1
+                return
+            stats["latencies"].append(time.monotonic() - start)
+        await connection.request("DELETE", f"/games/{state['id']}")
+    finally:
+        connection.close()
+
+async def run(args):
+    host, port = args.host, args.port
+    server = None
+    if port is None:
+        server = GameServer(args.workers)
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    stats = {"games": 0, "rejected": 0, "timeouts": 0, "errors": 0, "latencies": []}
+    start = time.monotonic()
+    try:
+        await asyncio.gather(*(play(host, port, index, args, stats) for index in range(args.players)))
+    finally:
+        if server is not None:
+            listener.close()
+            server.close()
+    elapsed = time.monotonic() - start
+    latencies = stats["latencies"]
+    print(f"{args.players} players, {stats['games']} games, {len(latencies)} moves in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.1f} moves/s)")
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.0f}ms p90 {percentile(latencies, 0.9) * 1000:.0f}ms "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms max {max(latencies, default=0.0) * 1000:.0f}ms")
+    print(f"{stats['rejected']} rejected (503), {stats['timeouts']} past deadline (504), {stats['errors']} errors")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many simulated games against game_server.py at once.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="a running server (default: start one here)")
+    parser.add_argument("--workers", type=int, default=None, help="search processes of the server started here")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--moves", type=int, default=20, help="moves each player makes")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--movetime", type=float, default=1.0)
+    parser.add_argument("--think", type=float, default=0.5, help="most seconds a player waits before moving")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
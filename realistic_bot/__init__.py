@@ -0,0 +1,13 @@
+# The minimax bot's engine, without any of the pygame front end, so it can be imported by
+# scripts, tests and services. python -m realistic_bot starts the UCI front end.
+from .evaluation import evaluate_material, material_scores, push_scored
+from .safety import allows_mate_in_one, moves_not_allowing_mate
+from .search import (
+    BackgroundSearch,
+    SearchTimeout,
+    engine_move_choice,
+    minimax,
+    parallel_engine_move_choice,
+    principal_variation,
+    set_tt_size,
+)
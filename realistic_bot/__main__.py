@@ -0,0 +1,3 @@
+from .uci import main
+
+main()
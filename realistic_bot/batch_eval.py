@@ -0,0 +1,66 @@
+# Vectorised version of evaluate_material() for scoring many positions at once with NumPy,
+# e.g. every child of a node or a whole frontier. Each position is reduced to its twelve
+# piece bitboards, which are unpacked into a (positions, 12, 64) occupancy array and scored
+# against the same precomputed tables as the scalar evaluation in one pass.
+# NumPy is optional, everything else in the package works without it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import chess
+
+from .evaluation import QUEEN_OPENING_HALFMOVES, SQUARE_SCORES, SQUARE_SCORES_OPENING
+
+# Bitboard order used throughout: White pawn..king, then Black pawn..king
+PIECE_KEYS = [(color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+
+def build_score_arrays():
+    # (12, 64) arrays of the signed per-square scores, one with each queen table
+    if np is None:
+        raise ImportError("batch evaluation needs numpy")
+    opening = np.array([SQUARE_SCORES_OPENING[color][piece_type] for color, piece_type in PIECE_KEYS], dtype=np.float64)
+    normal = np.array([SQUARE_SCORES[color][piece_type] for color, piece_type in PIECE_KEYS], dtype=np.float64)
+    return opening, normal
+
+score_arrays = None
+
+def board_masks(board):
+    return [board.pieces_mask(piece_type, color) for color, piece_type in PIECE_KEYS]
+
+def evaluate_masks(masks, halfmove_clocks):
+    # masks: (positions, 12) piece bitboards in PIECE_KEYS order, halfmove_clocks: (positions,).
+    # Returns the material/placement score of every position, as evaluate_material() would
+    # without its checkmate/stalemate check.
+    global score_arrays
+    if score_arrays is None:
+        score_arrays = build_score_arrays()
+    opening, normal = score_arrays
+    masks = np.asarray(masks, dtype=np.uint64).reshape(-1, 12)
+    # Bit i of each little-endian uint64 is square i
+    occupancy = np.unpackbits(masks.view(np.uint8).reshape(-1, 12, 8), axis=2, bitorder="little")
+    occupancy = occupancy.reshape(-1, 12 * 64).astype(np.float64)
+    opening_scores = occupancy @ opening.reshape(-1)
+    normal_scores = occupancy @ normal.reshape(-1)
+    return np.where(np.asarray(halfmove_clocks) <= QUEEN_OPENING_HALFMOVES, opening_scores, normal_scores)
+
+def evaluate_batch(boards):
+    # Scores a list of boards, same values as evaluate_material() for positions that are
+    # not checkmate or stalemate
+    boards = list(boards)
+    if not boards:
+        return np.zeros(0)
+    return evaluate_masks([board_masks(board) for board in boards], [board.halfmove_clock for board in boards])
+
+def evaluate_children(board, moves):
+    # Scores the position after each of moves, in one vectorised pass
+    masks = []
+    halfmove_clocks = []
+    for move in moves:
+        board.push(move)
+        masks.append(board_masks(board))
+        halfmove_clocks.append(board.halfmove_clock)
+        board.pop()
+    if not masks:
+        return np.zeros(0)
+    return evaluate_masks(masks, halfmove_clocks)
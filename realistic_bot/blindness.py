@@ -0,0 +1,87 @@
+# The "realistic" part of the bot: like a person, it sometimes doesn't see long bishop, rook and
+# queen moves, and the further the piece travels the more likely it is to be missed.
+# Whether a move is missed only depends on the position, the move and the seed, so the search
+# sees the same moves every time it reaches a position (which the transposition table relies on),
+# and a run with the same seed is reproducible. Which moves each position hides is memoized,
+# as a frozenset of from * 64 + to indices, almost always empty.
+import random
+from collections import OrderedDict
+
+import chess
+
+# Chance of seeing a move by how far it goes, for diagonal and for straight moves
+DIAGONAL_WEIGHTS = [0, 1, 1, 0.99, 0.9, 0.85, 0.7, 0.6]
+STRAIGHT_WEIGHTS = [0, 1, 1, 0.99, 0.95, 0.9, 0.85, 0.8]
+
+# Set to False to search every legal move
+USE_BLINDNESS = True
+# Positions whose hidden moves are remembered, oldest are dropped first
+BLINDNESS_CACHE_ENTRIES = 100000
+
+def see_chance(piece_type, from_square, to_square):
+    file_diff = abs(chess.square_file(to_square) - chess.square_file(from_square))
+    rank_diff = abs(chess.square_rank(to_square) - chess.square_rank(from_square))
+    if piece_type == chess.BISHOP or (piece_type == chess.QUEEN and file_diff > 0 and rank_diff > 0):
+        return DIAGONAL_WEIGHTS[rank_diff]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        return STRAIGHT_WEIGHTS[max(rank_diff, file_diff)]
+    return 1
+
+def build_see_thresholds():
+    # thresholds[piece_type][from * 64 + to]: a move is seen when its 32-bit hash is below this.
+    # None for pawns, knights and kings, which are always seen.
+    thresholds = [None] * 7
+    for piece_type in (chess.BISHOP, chess.ROOK, chess.QUEEN):
+        thresholds[piece_type] = [
+            int(see_chance(piece_type, from_square, to_square) * 2 ** 32)
+            for from_square in chess.SQUARES for to_square in chess.SQUARES
+        ]
+    return thresholds
+
+SEE_THRESHOLDS = build_see_thresholds()
+
+blindness_seed = 0
+move_keys = None
+# zobrist hash -> frozenset of the indices of the moves missed there
+visible_cache = OrderedDict()
+NOTHING_HIDDEN = frozenset()
+
+def set_blindness_seed(seed):
+    # Different seeds miss different moves. Changing it forgets the memoized positions.
+    global blindness_seed, move_keys
+    blindness_seed = seed
+    rng = random.Random(seed)
+    move_keys = [rng.getrandbits(64) for _ in range(64 * 64)]
+    visible_cache.clear()
+
+set_blindness_seed(blindness_seed)
+
+def is_seen(key, piece_type, move):
+    thresholds = SEE_THRESHOLDS[piece_type]
+    if thresholds is None:
+        return True
+    index = move.from_square * 64 + move.to_square
+    # Mix the position key with the move's key, and use the top 32 bits as the dice roll
+    h = key ^ move_keys[index]
+    h ^= h >> 31
+    h = (h * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    return (h >> 32) < thresholds[index]
+
+def visible_moves(board, key):
+    # The legal moves the bot notices in this position, key being its zobrist hash.
+    # If it would miss every move it sees them all instead.
+    moves = list(board.legal_moves)
+    if not USE_BLINDNESS:
+        return moves
+    hidden = visible_cache.get(key)
+    if hidden is None:
+        hidden = frozenset(move.from_square * 64 + move.to_square for move in moves
+                           if not is_seen(key, board.piece_type_at(move.from_square), move))
+        if len(hidden) == len(moves):
+            hidden = NOTHING_HIDDEN
+        if len(visible_cache) >= BLINDNESS_CACHE_ENTRIES:
+            visible_cache.popitem(last=False)
+        visible_cache[key] = hidden
+    if hidden:
+        moves = [move for move in moves if move.from_square * 64 + move.to_square not in hidden]
+    return moves
@@ -0,0 +1,92 @@
+# Opening book. Build one from PGN files with
+#   python -m realistic_bot.make_book games.pgn more_games.pgn --plies 20
+# which streams the games and writes a Polyglot book (BOOK_PATH by default). Each move is
+# weighted by how often it was played and how it scored for the side that played it, and
+# engine_move_choice() picks a book move at random by those weights before searching.
+# The book is memory-mapped and looked up by binary search on the position's zobrist key.
+import os
+import random
+import struct
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+BOOK_PATH = os.environ.get("REALISTIC_BOT_BOOK", os.path.join(os.path.dirname(__file__), "book.bin"))
+# Only the first this many plies of each game go into the book
+BOOK_PLIES = 20
+# Points a move gets per game, for the side that played it
+RESULT_WEIGHTS = {"win": 2, "draw": 1, "loss": 0}
+# Polyglot entries: key, move, weight, learn
+ENTRY_STRUCT = struct.Struct(">QHHI")
+MAX_WEIGHT = 0xFFFF
+
+def encode_move(board, move):
+    # Polyglot stores castling as the king taking its own rook
+    to_square = move.to_square
+    if board.is_castling(move):
+        to_square = chess.square(7 if board.is_kingside_castling(move) else 0, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | move.from_square << 6 | promotion << 12
+
+def result_weight(result, color):
+    if result == "1-0":
+        return RESULT_WEIGHTS["win" if color == chess.WHITE else "loss"]
+    if result == "0-1":
+        return RESULT_WEIGHTS["win" if color == chess.BLACK else "loss"]
+    # Draws and unfinished games
+    return RESULT_WEIGHTS["draw"]
+
+def add_games(weights, pgn, plies=BOOK_PLIES):
+    # Adds the opening moves of every game in the open PGN file to weights,
+    # a dict of (key, raw move) -> weight. Returns the number of games read.
+    games = 0
+    while True:
+        game = chess.pgn.read_game(pgn)
+        if game is None:
+            return games
+        games += 1
+        result = game.headers.get("Result", "*")
+        board = game.board()
+        for move in game.mainline_moves():
+            if board.ply() >= plies:
+                break
+            entry = (chess.polyglot.zobrist_hash(board), encode_move(board, move))
+            weights[entry] = weights.get(entry, 0) + result_weight(result, board.turn)
+            board.push(move)
+
+def write_book(weights, path, min_weight=1):
+    # Sorted by key (best moves first within a position), as Polyglot readers expect.
+    # Weights are scaled down to fit in 16 bits if they have to be.
+    entries = [(key, move, weight) for (key, move), weight in weights.items() if weight >= min_weight]
+    scale = max((weight for _, _, weight in entries), default=0) / MAX_WEIGHT
+    entries.sort(key=lambda entry: (entry[0], -entry[2]))
+    with open(path, "wb") as f:
+        for key, move, weight in entries:
+            if scale > 1:
+                weight = max(1, int(weight / scale))
+            f.write(ENTRY_STRUCT.pack(key, move, weight, 0))
+    return len(entries)
+
+# The book is opened on first use, and a missing one is only looked for once
+book_reader = None
+book_missing = False
+
+def open_book():
+    global book_reader, book_missing
+    if book_reader is None and not book_missing:
+        try:
+            book_reader = chess.polyglot.open_reader(BOOK_PATH)
+        except (OSError, ValueError):
+            book_missing = True
+    return book_reader
+
+def book_move(board):
+    # A weighted random book move for this position, or None
+    reader = open_book()
+    if reader is None:
+        return None
+    try:
+        return reader.weighted_choice(board, random=random).move
+    except IndexError:
+        return None
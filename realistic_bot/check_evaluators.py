@@ -0,0 +1,28 @@
+# Checks that every evaluator in EVALUATORS gives the same scores on the fixture positions:
+#   python -m realistic_bot.check_evaluators
+import sys
+
+import chess
+
+from .evaluation import EVALUATORS
+from .positions import EVAL_FIXTURES
+
+def check_evaluators(fens):
+    # Returns the positions where the evaluators disagree, with each evaluator's scores
+    mismatches = []
+    for fen in fens:
+        board = chess.Board(fen)
+        results = {name: evaluator(board) for name, evaluator in EVALUATORS.items()}
+        if len(set(results.values())) > 1:
+            mismatches.append((fen, results))
+    return mismatches
+
+def main():
+    mismatches = check_evaluators(EVAL_FIXTURES)
+    for fen, results in mismatches:
+        print("Mismatch:", fen, results)
+    print(f"{len(EVAL_FIXTURES) - len(mismatches)}/{len(EVAL_FIXTURES)} positions agree")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# Static evaluation for the minimax bot: material and piece-square tables, plus the
+# incremental version of the same score that the search keeps up to date move by move.
+# The values below are the hand-made defaults. If TABLES_PATH exists (written by
+# python -m realistic_bot.tune_tables, see texel.py) its values replace them on import.
+import json
+import os
+
+import chess
+
+#Define a function to get the list of attackers, returning a dictionary
+'''def check_attackers(board, color):
+    attacked_info = {}
+    # For each square with a piece... 
+    for square, piece in board.piece_map().items():
+        if piece.color == color:
+            # Get squares where enemy pieces are attacking this square
+            enemy_attackers = board.attackers(not color, square)
+            if enemy_attackers:
+                attacked_info[square] = enemy_attackers
+    return attacked_info'''
+
+# Material values for each piece, in centipawns (so a pawn is 100/100s of a pawn)
+PIECE_VALUES = {
+    chess.PAWN:   100,
+    chess.KNIGHT: 300,
+    chess.BISHOP: 330,
+    chess.ROOK:   500,
+    chess.QUEEN:  900,
+    chess.KING:   0  
+}
+
+# Piece tables to promote the engine to move to certain squares and develop earlygame
+# These tables are written for White. Both colours look them up by the same square index,
+# which is what the evaluation has always done, so the tables below keep that behaviour.
+PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  20, -10,   0,   0, -10,  20,   5,
+     5,  10,  10, -100, -100,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0
+]
+
+KNIGHT_TABLE = [
+   -50, -10,  -5, -10, -10,  -5, -10, -50,
+   -10, -10,   0,   5,   5,   0, -10, -10,
+   -10,  5,   25,  20,  20,  25,   5, -10,
+   -10,  0,   10,  -20, -20, 10,   0, -10,
+   -10,  5,   5,  -20, -20,  5,   5, -10,
+   -10,  0,   25,  0,  0,  20,   0, -10,
+   -10, -10,   0,   0,   0,   0, -10, -10,
+   -50, -10,  -5, -10, -10,  -5, -10, -50
+]
+
+BISHOP_TABLE = [
+   -30, -10, -10, -10, -10, -10, -10, -30,
+   -10,   0,   0,  0,   0,   0,   0,  0,
+   -10,   0,   0,  0,   0,   0,   0,  0,
+   -10,   5,   0,  10,  10,  0,   5, -10,
+   -10,   0,   20,  10,  10,  20,   0, -10,
+    4,    0,   0,  0,   0,   0,   0,   4,
+   -10,   5,   0,  0,   0,   0,   5, -10,
+   -30, -10, -20, -10, -10, -20, -10, -30
+]
+
+ROOK_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     10,  20,  20,  20,  20,  20,  20,   10,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   10,   10,   3,   0,   0
+]
+
+#We'd want it to prioritize open files, but right now, we can just have it take the center files and such. 
+# The opening table is used while the halfmove clock is still low, the other one after that
+QUEEN_TABLE_OPENING = [
+    -100, -100, -100,  50,  50, -100, -100, -100,
+    -100, -100, -100,   100,  100,  -100,  -100, -100,
+    -100, -100, -100,  -100, -100,-100,   -100, -100,
+    -100, -100, -100,   -100,   -100,   -100,   -100,  -100,
+    -100, -100, -100,   -100,   -100,   -100,   -100,  -100,
+    -100, -100, -100,   -100,   -100,   -100,   -100, -100,
+    -100, -100, -100,   -100,   -100,   -100,   -100, -100,
+    -100, -100, -100,  -100,  -100, -100, -100, -100
+]
+
+QUEEN_TABLE = [
+    -20, -10, -10,  -50,  -50, -10, -10, -20,
+    -10,   0,   0,   -30,  -30,  0,   0, -10,
+    -10,   10, 10,  0,   0,     10,   10, -10,
+    -5,   10,   10,  30,   30,   10,   10,  -5,
+    -5,   10,   10,   30,   30,   10,   10,  -5,
+    20,   40,   40,   20,   20,   40,   40, 20,
+    20,   40,   40,   40,   40,   40,   40, 20,
+    -20, -10, -10,  -5,  -5, -10, -10, -20
+]
+
+KING_TABLE = [
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20
+]
+
+# Past this halfmove clock the queen switches from the opening table to the normal one
+QUEEN_OPENING_HALFMOVES = 10
+
+def build_square_scores(queen_table):
+    # Precompute the signed contribution of every (colour, piece type, square), so the
+    # evaluation is a single list lookup per piece. Indexed as scores[color][piece_type][square],
+    # White adds 1.5 * material + positional bonus and Black subtracts it.
+    piece_tables = {
+        chess.PAWN: PAWN_TABLE,
+        chess.KNIGHT: KNIGHT_TABLE,
+        chess.BISHOP: BISHOP_TABLE,
+        chess.ROOK: ROOK_TABLE,
+        chess.QUEEN: queen_table,
+        chess.KING: KING_TABLE,
+    }
+    scores = [[None] * 7, [None] * 7]
+    for piece_type, table in piece_tables.items():
+        material = PIECE_VALUES[piece_type]
+        scores[chess.WHITE][piece_type] = [1.5*material + table[square] for square in chess.SQUARES]
+        scores[chess.BLACK][piece_type] = [-(1.5*material + table[square]) for square in chess.SQUARES]
+    return scores
+
+SQUARE_SCORES_OPENING = build_square_scores(QUEEN_TABLE_OPENING)
+SQUARE_SCORES = build_square_scores(QUEEN_TABLE)
+
+# The same split into material (one signed value per colour and piece type, multiplied by
+# the piece count) and the positional bonus per square, for the bitboard evaluator
+MATERIAL_SCORES = [[0] * 7, [0] * 7]
+POSITION_SCORES_OPENING = [[None] * 7, [None] * 7]
+POSITION_SCORES = [[None] * 7, [None] * 7]
+
+def build_position_scores():
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            material = 1.5*PIECE_VALUES[piece_type] if color == chess.WHITE else -1.5*PIECE_VALUES[piece_type]
+            MATERIAL_SCORES[color][piece_type] = material
+            POSITION_SCORES_OPENING[color][piece_type] = [value - material for value in SQUARE_SCORES_OPENING[color][piece_type]]
+            POSITION_SCORES[color][piece_type] = [value - material for value in SQUARE_SCORES[color][piece_type]]
+
+build_position_scores()
+
+# Tables file: {"piece_values": {"pawn": 100, ...}, "tables": {"pawn": [64 values], ...}},
+# with the tables in the same square order as above
+TABLES_PATH = os.environ.get("REALISTIC_BOT_TABLES", os.path.join(os.path.dirname(__file__), "tables.json"))
+PIECE_NAMES = {chess.PAWN: "pawn", chess.KNIGHT: "knight", chess.BISHOP: "bishop", chess.ROOK: "rook",
+               chess.QUEEN: "queen", chess.KING: "king"}
+TABLES = {
+    "pawn": PAWN_TABLE,
+    "knight": KNIGHT_TABLE,
+    "bishop": BISHOP_TABLE,
+    "rook": ROOK_TABLE,
+    "queen_opening": QUEEN_TABLE_OPENING,
+    "queen": QUEEN_TABLE,
+    "king": KING_TABLE,
+}
+
+def load_tables(path=TABLES_PATH):
+    # Replaces the piece values and tables with the ones in the file and rebuilds the scores
+    # from them. Everything is updated in place, so modules that imported the tables see the
+    # new values too (batch_eval.py only if it hasn't scored anything yet).
+    with open(path) as f:
+        data = json.load(f)
+    piece_values = data.get("piece_values", {})
+    tables = data.get("tables", {})
+    for name, table in tables.items():
+        if name not in TABLES or len(table) != 64:
+            raise ValueError(f"{path}: bad table {name}")
+    for piece_type, name in PIECE_NAMES.items():
+        if name in piece_values:
+            PIECE_VALUES[piece_type] = piece_values[name]
+    for name, table in tables.items():
+        TABLES[name][:] = table
+    for target, queen_table in ((SQUARE_SCORES_OPENING, QUEEN_TABLE_OPENING), (SQUARE_SCORES, QUEEN_TABLE)):
+        for color, color_scores in enumerate(build_square_scores(queen_table)):
+            target[color][:] = color_scores
+    build_position_scores()
+
+def write_tables(path, piece_values, tables):
+    # piece_values: piece type -> value, tables: name in TABLES -> 64 values
+    data = {
+        "piece_values": {PIECE_NAMES[piece_type]: value for piece_type, value in piece_values.items()},
+        "tables": {name: list(table) for name, table in tables.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+
+if os.path.exists(TABLES_PATH):
+    load_tables(TABLES_PATH)
+
+def material_scores_piece_map(board):
+    # Full material/placement count, once with each queen table: (opening, normal)
+    opening = 0
+    normal = 0
+    for square, piece in board.piece_map().items():
+        opening += SQUARE_SCORES_OPENING[piece.color][piece.piece_type][square]
+        normal += SQUARE_SCORES[piece.color][piece.piece_type][square]
+    return opening, normal
+
+def material_scores_bitboard(board):
+    # Same count without building a piece_map() dict: material is the popcount of each piece
+    # bitboard times the piece value, and only the positional bonus is summed square by square
+    opening = 0
+    normal = 0
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            mask = board.pieces_mask(piece_type, color)
+            if not mask:
+                continue
+            material = chess.popcount(mask) * MATERIAL_SCORES[color][piece_type]
+            opening += material
+            normal += material
+            opening_table = POSITION_SCORES_OPENING[color][piece_type]
+            normal_table = POSITION_SCORES[color][piece_type]
+            for square in chess.scan_forward(mask):
+                opening += opening_table[square]
+                normal += normal_table[square]
+    return opening, normal
+
+# Both evaluators give identical scores (python -m realistic_bot.check_evaluators checks this
+# on the fixture positions), set_evaluator() picks the one used for full counts
+EVALUATORS = {
+    "piece_map": material_scores_piece_map,
+    "bitboard": material_scores_bitboard,
+}
+selected_evaluator = material_scores_bitboard
+
+def set_evaluator(name):
+    global selected_evaluator
+    selected_evaluator = EVALUATORS[name]
+
+def material_scores(board):
+    return selected_evaluator(board)
+
+def move_score_delta(board, move):
+    # How the (opening, normal) scores change if move is played. Must be called before the push.
+    color = board.turn
+    piece_type = board.piece_type_at(move.from_square)
+    new_type = move.promotion or piece_type
+    delta = []
+    for scores in (SQUARE_SCORES_OPENING, SQUARE_SCORES):
+        own = scores[color]
+        change = own[new_type][move.to_square] - own[piece_type][move.from_square]
+        if board.is_castling(move):
+            # The rook jumps over the king, on the same rank
+            rank = chess.square_rank(move.from_square)
+            if chess.square_file(move.to_square) == 6:
+                rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+            else:
+                rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+            change += own[chess.ROOK][rook_to] - own[chess.ROOK][rook_from]
+        elif board.is_en_passant(move):
+            captured_square = move.to_square - 8 if color == chess.WHITE else move.to_square + 8
+            change -= scores[not color][chess.PAWN][captured_square]
+        else:
+            captured_type = board.piece_type_at(move.to_square)
+            if captured_type:
+                change -= scores[not color][captured_type][move.to_square]
+        delta.append(change)
+    return delta[0], delta[1]
+
+def push_scored(board, move, scores):
+    # Push move and return the updated (opening, normal) scores. The caller keeps its own
+    # scores, so a plain board.pop() undoes both.
+    d_opening, d_normal = move_score_delta(board, move)
+    board.push(move)
+    return scores[0] + d_opening, scores[1] + d_normal
+
+def evaluate_scores(board, scores, has_moves=None):
+    # Same result as evaluate_material(), but from scores kept up to date by push_scored().
+    # has_moves says whether the side to move has a legal move, when the caller already knows,
+    # so checkmate and stalemate can be told apart without generating the moves again.
+    if has_moves is None:
+        if board.is_checkmate():
+            return -float('inf') if board.turn == chess.WHITE else float('inf')
+        if board.is_stalemate():
+            return 0 
+    elif not has_moves:
+        if board.is_check():
+            return -float('inf') if board.turn == chess.WHITE else float('inf')
+        return 0
+    return scores[0] if board.halfmove_clock <= QUEEN_OPENING_HALFMOVES else scores[1]
+
+#Define a function that evaluates material and placement of pieces. This is to define the 3-depth minimax bot
+def evaluate_material(board):
+    # Return inf for white mate, -inf for black mate, and 0 for stalemate. 
+    return evaluate_scores(board, material_scores(board))
@@ -0,0 +1,8 @@
+# Summaries of move timings, shared by the scripts that report latency (tournament.py,
+# game_server.py and load_test.py).
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
@@ -0,0 +1,25 @@
+# Builds the opening book used by engine_move_choice() from PGN files, see book.py:
+#   python -m realistic_bot.make_book games.pgn more_games.pgn --plies 20
+import argparse
+import sys
+
+from . import book
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Polyglot opening book from PGN files.")
+    parser.add_argument("pgn", nargs="+")
+    parser.add_argument("-o", "--output", default=book.BOOK_PATH)
+    parser.add_argument("--plies", type=int, default=book.BOOK_PLIES, help="plies of each game to use")
+    parser.add_argument("--min-weight", type=int, default=1, help="leave out moves weighted below this")
+    args = parser.parse_args()
+
+    weights = {}
+    games = 0
+    for path in args.pgn:
+        with open(path, encoding="utf-8", errors="replace") as pgn:
+            games += book.add_games(weights, pgn, args.plies)
+    entries = book.write_book(weights, args.output, args.min_weight)
+    print(f"{games} games, {entries} book entries written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
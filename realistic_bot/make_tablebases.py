@@ -0,0 +1,9 @@
+# Builds the endgame tables used by the search, see tablebase.py:
+#   python -m realistic_bot.make_tablebases
+from .tablebase import generate_tables
+
+def main():
+    generate_tables()
+
+if __name__ == "__main__":
+    main()
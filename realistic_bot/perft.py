@@ -0,0 +1,53 @@
+# Move generation check and benchmark: counts the leaf nodes of the full move tree of each
+# position in PERFT_POSITIONS and compares them with the known counts.
+#   python -m realistic_bot.perft --depth 3
+# Exits with 1 if any count is wrong.
+import argparse
+import sys
+import time
+
+import chess
+
+from .positions import PERFT_POSITIONS
+
+def perft(board, depth):
+    # Leaf nodes of the move tree depth plies deep. The last ply is only counted, not played.
+    if depth == 1:
+        return board.legal_moves.count()
+    nodes = 0
+    for move in board.generate_legal_moves():
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+def run_suite(max_depth):
+    # Returns [(fen, depth, expected, counted, seconds)] for every position up to max_depth
+    results = []
+    for fen, counts in PERFT_POSITIONS:
+        board = chess.Board(fen)
+        for depth, expected in enumerate(counts[:max_depth], 1):
+            start = time.perf_counter()
+            counted = perft(board, depth)
+            results.append((fen, depth, expected, counted, time.perf_counter() - start))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time move generation on the perft positions.")
+    parser.add_argument("--depth", type=int, default=3, help="deepest perft to run per position")
+    args = parser.parse_args()
+
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+    for fen, depth, expected, counted, seconds in run_suite(args.depth):
+        status = "ok" if counted == expected else f"WRONG, expected {expected}"
+        failures += counted != expected
+        total_nodes += counted
+        total_time += seconds
+        print(f"{fen} depth {depth}: {counted} nodes in {seconds:.2f}s {status}")
+    print(f"{total_nodes} nodes in {total_time:.2f}s, {total_nodes / total_time if total_time else 0:.0f} nodes/s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Optional on-disk cache of search results, so what one game or session worked out is still
+# there for the next one. It's off unless enable_position_cache() is called (or
+# REALISTIC_BOT_CACHE names the file). The file is a fixed array of 16 byte records, one slot
+# per key modulo the number of slots, and is memory-mapped so only the pages actually probed
+# are read in. Several engine processes can use the same file at once: writes take a lock,
+# and each record stores key XOR fingerprint XOR data next to data, so a record that is being
+# rewritten while it is read just doesn't match the key instead of giving a wrong result.
+# The fingerprint is a hash of what the results depend on (the evaluation tables, the
+# blindness seed, the engine version, see search.engine_fingerprint()), so results of another
+# configuration miss the same way and processes with different seeds or tables can share a
+# file. The first record is a header with the file format, files of another format are emptied.
+import mmap
+import os
+import struct
+
+# Unix only, elsewhere writers don't lock and rely on the key check alone
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import chess
+
+# 16 MB
+CACHE_SLOTS = 1 << 20
+RECORD = struct.Struct("<QQ")
+# Packed into the 8 data bytes: score, move, depth, flag
+DATA = struct.Struct("<fHBB")
+# Results from shallower searches than this aren't worth writing
+CACHE_MIN_DEPTH = 2
+# Header record: magic, format version
+HEADER = struct.Struct("<8sQ")
+CACHE_MAGIC = b"RBPCACHE"
+CACHE_FORMAT = 2
+
+cache_file = None
+cache_map = None
+cache_slots = 0
+# Fingerprint of this process's results, see set_fingerprint()
+cache_fingerprint = 0
+
+def enable_position_cache(path, slots=CACHE_SLOTS):
+    # Opens (or creates) the cache file. An existing file keeps its own size.
+    global cache_file, cache_map, cache_slots
+    disable_position_cache()
+    cache_file = open(path, "a+b")
+    if os.fstat(cache_file.fileno()).st_size < 2 * RECORD.size:
+        cache_file.truncate((slots + 1) * RECORD.size)
+    cache_map = mmap.mmap(cache_file.fileno(), 0)
+    cache_slots = len(cache_map) // RECORD.size - 1
+    check_format()
+
+def disable_position_cache():
+    global cache_file, cache_map, cache_slots
+    if cache_map is not None:
+        cache_map.close()
+        cache_file.close()
+    cache_file = None
+    cache_map = None
+    cache_slots = 0
+
+def lock():
+    if fcntl is not None:
+        fcntl.lockf(cache_file, fcntl.LOCK_EX)
+
+def unlock():
+    if fcntl is not None:
+        fcntl.lockf(cache_file, fcntl.LOCK_UN)
+
+def check_format():
+    # Empties a file written in another format, or before there was a header
+    if HEADER.unpack_from(cache_map, 0) == (CACHE_MAGIC, CACHE_FORMAT):
+        return
+    lock()
+    try:
+        # Another process may have reset it in the meantime
+        if HEADER.unpack_from(cache_map, 0) != (CACHE_MAGIC, CACHE_FORMAT):
+            cache_map[RECORD.size:] = bytes(len(cache_map) - RECORD.size)
+            HEADER.pack_into(cache_map, 0, CACHE_MAGIC, CACHE_FORMAT)
+    finally:
+        unlock()
+
+def set_fingerprint(fingerprint):
+    # The 64 bit fingerprint the next probes and stores are for. Records stored under another
+    # one are left in place and just don't match.
+    global cache_fingerprint
+    cache_fingerprint = fingerprint
+
+def slot_offset(key):
+    # Each fingerprint spreads its keys over the slots differently, so configurations don't
+    # keep overwriting each other's results. The header takes the first record.
+    return ((key ^ cache_fingerprint) % cache_slots + 1) * RECORD.size
+
+def encode_move(move):
+    if move is None:
+        return 0
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+def decode_move(raw):
+    if raw == 0:
+        return None
+    return chess.Move(raw & 63, raw >> 6 & 63, raw >> 12 or None)
+
+def probe_position(key):
+    # (depth, score, flag, best_move) like a transposition table entry, or None, also when
+    # the slot holds a result for another fingerprint
+    checked_key, data = RECORD.unpack_from(cache_map, slot_offset(key))
+    if checked_key ^ cache_fingerprint ^ data != key or data == 0:
+        return None
+    score, move, depth, flag = DATA.unpack(data.to_bytes(8, "little"))
+    return depth, score, flag, decode_move(move)
+
+def store_positions(entries):
+    # entries: (key, (depth, score, flag, best_move)) pairs. A slot holding a deeper result
+    # for the same key and fingerprint is left alone, anything else is overwritten.
+    lock()
+    try:
+        for key, (depth, score, flag, best_move) in entries:
+            if depth < CACHE_MIN_DEPTH:
+                continue
+            offset = slot_offset(key)
+            checked_key, old_data = RECORD.unpack_from(cache_map, offset)
+            if checked_key ^ cache_fingerprint ^ old_data == key and old_data and old_data >> 48 & 0xFF > depth:
+                continue
+            data = int.from_bytes(DATA.pack(score, encode_move(best_move), min(depth, 255), flag), "little")
+            RECORD.pack_into(cache_map, offset, key ^ cache_fingerprint ^ data, data)
+    finally:
+        unlock()
+
+if os.environ.get("REALISTIC_BOT_CACHE"):
+    enable_position_cache(os.environ["REALISTIC_BOT_CACHE"])
@@ -0,0 +1,25 @@
+# Cheap one-ply safety check: which moves don't let the opponent mate straight away.
+# Only replies that give check can mate, so every other reply is skipped without being played,
+# and the board is pushed and popped in place instead of copied.
+
+def allows_mate_in_one(board, move):
+    # True if after move the opponent has a mating reply
+    board.push(move)
+    try:
+        for reply in board.legal_moves:
+            if not board.gives_check(reply):
+                continue
+            board.push(reply)
+            mated = board.is_checkmate()
+            board.pop()
+            if mated:
+                return True
+        return False
+    finally:
+        board.pop()
+
+def moves_not_allowing_mate(board, moves=None):
+    # The set of moves (all legal moves by default) after which the opponent can't mate in one
+    if moves is None:
+        moves = board.legal_moves
+    return {move for move in moves if not allows_mate_in_one(board, move)}
@@ -0,0 +1,838 @@
+# The minimax bot's search: alpha-beta with a transposition table, move ordering,
+# quiescence, null-move pruning, late move reductions, principal variation search,
+# iterative deepening with aspiration windows under a time/node budget, and a root-parallel mode.
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+import chess.polyglot
+
+from . import blindness, book, position_cache, tablebase
+from .evaluation import PIECE_VALUES, QUEEN_OPENING_HALFMOVES, TABLES, evaluate_scores, material_scores, push_scored
+from .safety import moves_not_allowing_mate
+
+# Transposition table, so positions reached by different move orders aren't searched twice.
+# Maps the zobrist key of a position to (depth, score, flag, best_move), where flag says
+# whether the score is exact or only a lower/upper bound from an alpha-beta cutoff.
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+# Rough size of one entry (OrderedDict slot and link, tuple, float and Move), used to turn
+# megabytes into entries
+TT_ENTRY_BYTES = 250
+TT_SIZE_MB = 64
+tt_max_entries = TT_SIZE_MB * 1024 * 1024 // TT_ENTRY_BYTES
+saved_positions = OrderedDict()
+# Keys stored or replaced since the table was last written to the on-disk cache, so only
+# those are written after the next search
+unsaved_keys = set()
+
+def set_tt_size(megabytes):
+    global tt_max_entries
+    tt_max_entries = max(1, int(megabytes * 1024 * 1024) // TT_ENTRY_BYTES)
+    # Drop the oldest entries if the table shrank
+    while len(saved_positions) > tt_max_entries:
+        saved_positions.popitem(last=False)
+
+def score_to_tt(score, ply):
+    # Tablebase scores count plies to mate from the root (see tablebase.probe_score()). The
+    # table keeps them counted from the position itself, so they are still right when the
+    # position comes up again at another ply.
+    if tablebase.TABLEBASE_BOUND < abs(score) < float('inf'):
+        return score + ply if score > 0 else score - ply
+    return score
+
+def score_from_tt(score, ply):
+    if tablebase.TABLEBASE_BOUND < abs(score) < float('inf'):
+        return score - ply if score > 0 else score + ply
+    return score
+
+def store_position(key, depth, score, flag, best_move):
+    # Keep the deeper result for the same position. When the table is full, evict the
+    # oldest entry (rewriting an entry moves it to the back). An OrderedDict pops its front
+    # in O(1), a plain dict would scan past every slot already deleted there.
+    entry = saved_positions.get(key)
+    if entry is not None:
+        if entry[0] > depth:
+            return
+        saved_positions.move_to_end(key)
+    elif len(saved_positions) >= tt_max_entries:
+        saved_positions.popitem(last=False)
+    saved_positions[key] = (depth, score, flag, best_move)
+    if position_cache.cache_map is not None and depth >= position_cache.CACHE_MIN_DEPTH:
+        unsaved_keys.add(key)
+
+# Move ordering. Alpha-beta only prunes well when the best move comes first, so moves are
+# sorted: the transposition table move, then captures by MVV-LVA (most valuable victim,
+# least valuable attacker), promotions, the killer moves of this ply, and finally quiet
+# moves by how often they caused a cutoff before (history heuristic).
+MAX_PLY = 64
+killer_moves = [[None, None] for _ in range(MAX_PLY)]
+# history_table[color][from_square][to_square]
+history_table = [[[0] * 64 for _ in range(64)] for _ in range(2)]
+
+ORDER_TT_MOVE = 10_000_000
+ORDER_CAPTURE = 1_000_000
+ORDER_PROMOTION = 900_000
+ORDER_KILLER = 800_000
+
+def reset_move_ordering(clear_history=False):
+    # Killers only make sense within one search, history is kept but aged (or wiped)
+    for killers in killer_moves:
+        killers[0] = None
+        killers[1] = None
+    for color_table in history_table:
+        for from_table in color_table:
+            for to_square in range(64):
+                from_table[to_square] = 0 if clear_history else from_table[to_square] // 2
+
+def order_moves(board, moves, ply, tt_move=None, use_history=True):
+    killers = killer_moves[ply] if ply < MAX_PLY else (None, None)
+    history = history_table[board.turn] if use_history else None
+    scored = []
+    for move in moves:
+        if move == tt_move:
+            score = ORDER_TT_MOVE
+        elif board.is_capture(move):
+            victim = chess.PAWN if board.is_en_passant(move) else board.piece_type_at(move.to_square)
+            attacker = board.piece_type_at(move.from_square)
+            score = ORDER_CAPTURE + 10 * victim - attacker
+        elif move.promotion:
+            score = ORDER_PROMOTION + move.promotion
+        elif move == killers[0] or move == killers[1]:
+            score = ORDER_KILLER
+        elif history is not None:
+            score = history[move.from_square][move.to_square]
+        else:
+            score = 0
+        scored.append((score, move))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored]
+
+def record_cutoff(board, move, depth, ply):
+    # A quiet move that caused a beta cutoff becomes a killer for this ply and gains history
+    if board.is_capture(move) or move.promotion:
+        return
+    if ply < MAX_PLY:
+        killers = killer_moves[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+    history_table[board.turn][move.from_square][move.to_square] += depth * depth
+
+# Raised from inside minimax() when the time or node budget of a search runs out
+class SearchTimeout(Exception):
+    pass
+
+# Budget of the current search, set by engine_move_choice(). None means no limit.
+# Nodes are counted separately for the main search and the quiescence search, the budget
+# applies to both together.
+search_nodes = 0
+quiescence_nodes = 0
+search_deadline = None
+search_node_limit = None
+# threading.Event that another thread can set to stop the search early
+search_stop = None
+
+def check_budget():
+    # Reading the clock on every node is slow, so only look every 1024 nodes
+    nodes = search_nodes + quiescence_nodes
+    if search_node_limit is not None and nodes >= search_node_limit:
+        raise SearchTimeout()
+    if nodes % 1024 == 0:
+        if search_deadline is not None and time.monotonic() >= search_deadline:
+            raise SearchTimeout()
+        if search_stop is not None and search_stop.is_set():
+            raise SearchTimeout()
+
+# Search statistics, written as one JSON line per search. They are off unless enable_stats()
+# is called (or REALISTIC_BOT_STATS names a file to append to), and while off every hook is
+# a single "is None" check.
+search_stats = None
+stats_output = None
+# Cutoffs are counted by the index of the move that caused them, the last bucket takes the rest
+CUTOFF_BUCKETS = 16
+
+def enable_stats(output):
+    # output is a path to append to or an open text file
+    global stats_output
+    stats_output = open(output, "a", buffering=1) if isinstance(output, str) else output
+
+def disable_stats():
+    global stats_output
+    stats_output = None
+
+if os.environ.get("REALISTIC_BOT_STATS"):
+    enable_stats(os.environ["REALISTIC_BOT_STATS"])
+
+def new_search_stats():
+    return {
+        "leaf_evals": 0,
+        "time_game_over": 0.0,
+        "time_evaluate": 0.0,
+        "time_movegen": 0.0,
+        "cutoffs": [0] * CUTOFF_BUCKETS,
+        "ply_nodes": [0] * MAX_PLY,
+        "ply_moves": [0] * MAX_PLY,
+        "tt_probes": 0,
+        "tt_hits": 0,
+        "tt_cutoffs": 0,
+        "null_move_tries": 0,
+        "null_move_cutoffs": 0,
+        "lmr_reductions": 0,
+        "lmr_researches": 0,
+        "pvs_researches": 0,
+        "aspiration_researches": 0,
+    }
+
+def write_search_stats(board, depth, best_move, elapsed):
+    stats = search_stats
+    nodes = search_nodes + quiescence_nodes
+    plies = [ply for ply in range(MAX_PLY) if stats["ply_nodes"][ply]]
+    line = {
+        "fen": board.fen(),
+        "depth": depth,
+        "best_move": best_move.uci() if best_move else None,
+        "time": elapsed,
+        "nodes": search_nodes,
+        "quiescence_nodes": quiescence_nodes,
+        "nps": nodes / elapsed if elapsed > 0 else 0.0,
+        "leaf_evals": stats["leaf_evals"],
+        "time_game_over": stats["time_game_over"],
+        "time_evaluate": stats["time_evaluate"],
+        "time_movegen": stats["time_movegen"],
+        "cutoffs_by_move_index": stats["cutoffs"],
+        # Average number of moves searched per node at each ply
+        "branching_factor": [stats["ply_moves"][ply] / stats["ply_nodes"][ply] for ply in plies],
+        "tt_probes": stats["tt_probes"],
+        "tt_hits": stats["tt_hits"],
+        "tt_cutoffs": stats["tt_cutoffs"],
+        "tt_hit_rate": stats["tt_hits"] / stats["tt_probes"] if stats["tt_probes"] else 0.0,
+        "null_move_tries": stats["null_move_tries"],
+        "null_move_cutoffs": stats["null_move_cutoffs"],
+        "lmr_reductions": stats["lmr_reductions"],
+        "lmr_researches": stats["lmr_researches"],
+        "pvs_researches": stats["pvs_researches"],
+        "aspiration_researches": stats["aspiration_researches"],
+    }
+    stats_output.write(json.dumps(line) + "\n")
+
+def static_eval(board, scores, has_moves=None):
+    # evaluate_scores(), counted and timed when statistics are on
+    if search_stats is None:
+        return evaluate_scores(board, scores, has_moves)
+    start = time.perf_counter()
+    value = evaluate_scores(board, scores, has_moves)
+    search_stats["time_evaluate"] += time.perf_counter() - start
+    search_stats["leaf_evals"] += 1
+    return value
+
+def record_cutoff_index(index):
+    search_stats["cutoffs"][min(index, CUTOFF_BUCKETS - 1)] += 1
+
+# Quiescence search: at the end of the main search keep playing out captures and promotions
+# until the position is quiet, so we never stop in the middle of an exchange.
+USE_QUIESCENCE = True
+# Skip a capture if even winning the piece (plus this margin) can't bring the score back to alpha/beta
+DELTA_MARGIN = 200
+
+def quiescence(board, alpha, beta, is_maximizing, scores):
+    global quiescence_nodes
+    quiescence_nodes += 1
+    check_budget()
+    # Stand pat: the side to move doesn't have to capture, so the static score is a lower
+    # bound for it (an upper bound when minimizing)
+    stand_pat = static_eval(board, scores)
+    if stand_pat == float('inf') or stand_pat == -float('inf'):
+        return stand_pat
+    if is_maximizing:
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+    else:
+        if stand_pat <= alpha:
+            return stand_pat
+        beta = min(beta, stand_pat)
+
+    moves = list(board.generate_legal_captures())
+    moves += [move for move in board.generate_legal_moves(board.pawns, chess.BB_BACKRANKS) if not board.is_capture(move)]
+    best_eval = stand_pat
+    for move in order_moves(board, moves, MAX_PLY):
+        # Delta pruning
+        if board.is_en_passant(move):
+            gain = 1.5 * PIECE_VALUES[chess.PAWN]
+        else:
+            gain = 1.5 * PIECE_VALUES.get(board.piece_type_at(move.to_square), 0)
+        if move.promotion:
+            gain += 1.5 * (PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN])
+        if is_maximizing and stand_pat + gain + DELTA_MARGIN <= alpha:
+            continue
+        if not is_maximizing and stand_pat - gain - DELTA_MARGIN >= beta:
+            continue
+
+        child_scores = push_scored(board, move, scores)
+        eval = quiescence(board, alpha, beta, not is_maximizing, child_scores)
+        board.pop()
+        if is_maximizing:
+            best_eval = max(best_eval, eval)
+            alpha = max(alpha, eval)
+        else:
+            best_eval = min(best_eval, eval)
+            beta = min(beta, eval)
+        if beta <= alpha:
+            break
+    return best_eval
+
+# Selective search. Null-move pruning: if the side to move could pass and a shallower search
+# still fails high, a real move will too, so the node is cut off without searching its moves.
+# Not tried in check, straight after another null move, or when the side to move has nothing
+# but pawns, where zugzwang (every move makes things worse) is common.
+USE_NULL_MOVE = True
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+# Late move reductions: quiet moves late in the ordering are rarely best, so they are searched
+# REDUCTION plies shallower first, and only searched again at full depth if they beat the bound.
+USE_LMR = True
+LMR_REDUCTION = 1
+LMR_MIN_DEPTH = 3
+# Moves before this index (the table move, captures, promotions, killers) are never reduced
+LMR_MIN_INDEX = 3
+
+def null_move_allowed(board, depth):
+    if not USE_NULL_MOVE or depth < NULL_MOVE_MIN_DEPTH or board.is_check():
+        return False
+    if board.move_stack and not board.move_stack[-1]:
+        return False
+    pieces = board.occupied_co[board.turn] & ~board.pawns & ~board.kings
+    return pieces != 0
+
+def null_move_cutoff(board, depth, alpha, beta, is_maximizing, scores, ply):
+    # Passes the move and searches with a null window at the bound the side to move has to
+    # beat: beta when maximizing, alpha when minimizing. True if that already fails high.
+    if is_maximizing:
+        if beta == float('inf') or static_eval(board, scores, True) < beta:
+            return False
+        window = beta - 1, beta
+    else:
+        if alpha == -float('inf') or static_eval(board, scores, True) > alpha:
+            return False
+        window = alpha, alpha + 1
+    if search_stats is not None:
+        search_stats["null_move_tries"] += 1
+    board.push(chess.Move.null())
+    try:
+        eval = minimax(board, depth - 1 - NULL_MOVE_REDUCTION, window[0], window[1], not is_maximizing, scores, ply + 1)
+    finally:
+        board.pop()
+    cutoff = eval >= beta if is_maximizing else eval <= alpha
+    if cutoff and search_stats is not None:
+        search_stats["null_move_cutoffs"] += 1
+    return cutoff
+
+def lmr_allowed(board, move, depth, index, in_check, ply):
+    if not USE_LMR or depth < LMR_MIN_DEPTH or index < LMR_MIN_INDEX or in_check:
+        return False
+    if board.is_capture(move) or move.promotion:
+        return False
+    killers = killer_moves[ply] if ply < MAX_PLY else (None, None)
+    return move != killers[0] and move != killers[1]
+
+# Principal variation search: once the first move of a node has set the bound, the others are
+# only expected to fall short of it. They get a null window at that bound, which prunes much
+# more, and a full-window search again only if they turn out better after all.
+USE_PVS = True
+
+def search_child(board, depth, alpha, beta, is_maximizing, scores, ply, reduce=False, probe=False):
+    # minimax() of the position after the move the caller has just pushed, where
+    # is_maximizing is the side that played it. With reduce the move is first searched
+    # LMR_REDUCTION plies shallower (moves giving check aren't), with probe it is first searched
+    # with a null window. Whenever one of those beats the bound of the side that played the
+    # move, the search is repeated at the next step up, ending with full depth and full window.
+    bound = alpha if is_maximizing else beta
+    probe = probe and USE_PVS and abs(bound) != float('inf')
+    if not probe:
+        low, high = alpha, beta
+    elif is_maximizing:
+        low, high = alpha, alpha + 1
+    else:
+        low, high = beta - 1, beta
+    if reduce and not board.is_check():
+        if search_stats is not None:
+            search_stats["lmr_reductions"] += 1
+        eval = minimax(board, depth - 1 - LMR_REDUCTION, low, high, not is_maximizing, scores, ply + 1)
+        if (eval <= bound) if is_maximizing else (eval >= bound):
+            return eval
+        if search_stats is not None:
+            search_stats["lmr_researches"] += 1
+    if probe:
+        eval = minimax(board, depth - 1, low, high, not is_maximizing, scores, ply + 1)
+        if (eval <= bound) if is_maximizing else (eval >= bound):
+            return eval
+        # Past the other bound it cuts off anyway, an exact score isn't needed
+        if (eval >= beta) if is_maximizing else (eval <= alpha):
+            return eval
+        if search_stats is not None:
+            search_stats["pvs_researches"] += 1
+    return minimax(board, depth - 1, alpha, beta, not is_maximizing, scores, ply + 1)
+
+def is_rule_draw(board):
+    # board.is_game_over() without the checkmate and stalemate checks
+    return board.is_insufficient_material() or board.is_seventyfive_moves() or board.is_fivefold_repetition()
+
+#Define another evaluation function, based on the first one 
+def minimax(board, depth, alpha, beta, is_maximizing, scores=None, ply=1):
+    global search_nodes
+    search_nodes += 1
+    check_budget()
+    # scores is the incremental (opening, normal) material count of this position, see push_scored(),
+    # and ply is the distance from the root
+    if scores is None:
+        scores = material_scores(board)
+    # Draws by rule end the game whatever the moves are. Checkmate and stalemate are found
+    # from the move list further down (or by the quiescence search), so the moves of a node
+    # are only generated once.
+    if search_stats is None:
+        drawn = is_rule_draw(board)
+    else:
+        start = time.perf_counter()
+        drawn = is_rule_draw(board)
+        search_stats["time_game_over"] += time.perf_counter() - start
+    if drawn:
+        return static_eval(board, scores) + random.uniform(-5, 5)
+    if USE_TABLEBASES and chess.popcount(board.occupied) <= 3:
+        tablebase_score = tablebase.probe_score(board, ply)
+        if tablebase_score is not None:
+            return tablebase_score
+    #Base case if depth = 0, return material with some random noise 
+    if depth == 0:
+        if USE_QUIESCENCE:
+            return quiescence(board, alpha, beta, is_maximizing, scores) + random.uniform(-5, 5)
+        return static_eval(board, scores) + random.uniform(-5, 5)
+
+    # Look the position up first. A deep enough exact score can be returned straight away,
+    # and a bound can tighten the window (or cut off on its own)
+    key = chess.polyglot.zobrist_hash(board)
+    tt_move = None
+    entry = saved_positions.get(key)
+    if entry is None and position_cache.cache_map is not None:
+        entry = position_cache.probe_position(key)
+    if search_stats is not None:
+        search_stats["tt_probes"] += 1
+        if entry is not None:
+            search_stats["tt_hits"] += 1
+    if entry is not None:
+        entry_depth, entry_score, entry_flag, tt_move = entry
+        entry_score = score_from_tt(entry_score, ply)
+        if entry_depth >= depth:
+            if entry_flag == TT_EXACT:
+                if search_stats is not None:
+                    search_stats["tt_cutoffs"] += 1
+                return entry_score
+            elif entry_flag == TT_LOWER:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if beta <= alpha:
+                if search_stats is not None:
+                    search_stats["tt_cutoffs"] += 1
+                return entry_score
+    alpha_start, beta_start = alpha, beta
+
+    if search_stats is not None:
+        start = time.perf_counter()
+    # Only the moves the bot notices, see blindness.py. There are none only if there are no
+    # legal moves at all, which is checkmate or stalemate.
+    moves = blindness.visible_moves(board, key)
+    if search_stats is not None:
+        search_stats["time_movegen"] += time.perf_counter() - start
+    if not moves:
+        return static_eval(board, scores, False) + random.uniform(-5, 5)
+    if null_move_allowed(board, depth) and null_move_cutoff(board, depth, alpha, beta, is_maximizing, scores, ply):
+        return beta if is_maximizing else alpha
+    if search_stats is not None:
+        start = time.perf_counter()
+    # The best move from the last time we saw this position goes first
+    moves = order_moves(board, moves, ply, tt_move)
+    if search_stats is not None:
+        search_stats["time_movegen"] += time.perf_counter() - start
+        if ply < MAX_PLY:
+            search_stats["ply_nodes"][ply] += 1
+
+    best_move = None
+    in_check = board.is_check()
+    if is_maximizing:
+        max_eval = -float('inf')
+        for index, move in enumerate(moves):
+            reduce = lmr_allowed(board, move, depth, index, in_check, ply)
+            child_scores = push_scored(board, move, scores)
+            #Recursion
+            eval = search_child(board, depth, alpha, beta, True, child_scores, ply, reduce, index > 0)
+            board.pop()
+            if eval > max_eval or best_move is None:
+                max_eval = eval
+                best_move = move
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                record_cutoff(board, move, depth, ply)
+                if search_stats is not None:
+                    record_cutoff_index(index)
+                break
+        best_eval = max_eval
+    else:
+        min_eval = float('inf')
+        for index, move in enumerate(moves):
+            reduce = lmr_allowed(board, move, depth, index, in_check, ply)
+            child_scores = push_scored(board, move, scores)
+            #Recursion 
+            eval = search_child(board, depth, alpha, beta, False, child_scores, ply, reduce, index > 0)
+            board.pop()
+            if eval < min_eval or best_move is None:
+                min_eval = eval
+                best_move = move
+            beta = min(beta, eval)
+            if beta <= alpha:
+                record_cutoff(board, move, depth, ply)
+                if search_stats is not None:
+                    record_cutoff_index(index)
+                break
+        best_eval = min_eval
+    if search_stats is not None and ply < MAX_PLY:
+        # Moves actually searched, up to and including the one that cut off
+        search_stats["ply_moves"][ply] += index + 1
+
+    if best_eval <= alpha_start:
+        flag = TT_UPPER
+    elif best_eval >= beta_start:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    store_position(key, depth, score_to_tt(best_eval, ply), flag, best_move)
+    return best_eval
+
+# Look few-piece positions up in the endgame tables (see tablebase.py) when they are there
+USE_TABLEBASES = True
+
+def tablebase_move(board):
+    if USE_TABLEBASES and chess.popcount(board.occupied) <= 3:
+        return tablebase.best_move(board)
+    return None
+
+# Play from the opening book (see book.py) when there is one and it knows the position
+USE_BOOK = True
+
+def prepared_move(board):
+    # A move that needs no search: from the endgame tables or the opening book, else None
+    move = tablebase_move(board)
+    if move is None and USE_BOOK:
+        move = book.book_move(board)
+    return move
+
+# Bump when a change to the search makes results cached by an older version wrong
+ENGINE_VERSION = 1
+
+def engine_fingerprint():
+    # Everything the on-disk cache's results depend on, as a 64 bit int, see
+    # position_cache.set_fingerprint()
+    data = json.dumps([ENGINE_VERSION, sorted(PIECE_VALUES.items()), TABLES, QUEEN_OPENING_HALFMOVES,
+                       blindness.USE_BLINDNESS, blindness.blindness_seed])
+    return int.from_bytes(hashlib.blake2b(data.encode(), digest_size=8).digest(), "little")
+
+def cached_move(board, depth):
+    # The best move of an earlier search of this position at least depth deep, from the
+    # on-disk cache (see position_cache.py), or None
+    if position_cache.cache_map is None:
+        return None
+    entry = position_cache.probe_position(chess.polyglot.zobrist_hash(board))
+    if entry is None or entry[0] < depth or entry[2] != TT_EXACT or entry[3] is None:
+        return None
+    return entry[3] if entry[3] in board.legal_moves else None
+
+# Drop root moves that allow mate in one before searching, unless every move does. The search
+# would normally see those mates itself, but not at depth 1 or when the blindness model hides
+# the reply.
+ROOT_BLUNDER_CHECK = True
+
+def safe_root_moves(board):
+    moves = list(board.legal_moves)
+    if not ROOT_BLUNDER_CHECK:
+        return moves
+    safe = moves_not_allowing_mate(board, moves)
+    # Keep generation order so the search stays deterministic
+    return [move for move in moves if move in safe] or moves
+
+def inside_window(value, alpha, beta):
+    # Is value an exact score for a search with this window. An infinite side of the window
+    # is no limit at all, a score of +-inf (mate) there is still exact.
+    return (value > alpha or alpha == -float('inf')) and (value < beta or beta == float('inf'))
+
+def search_root(board, engine_color, depth, first_move=None, root_moves=None,
+                alpha=-float('inf'), beta=float('inf')):
+    # One full-depth search over every root move (or just root_moves), returning
+    # (best_move, best_value). first_move (normally the best move of the previous iteration)
+    # is searched first. The bound found so far is passed on to the moves after it, which are
+    # searched with principal variation search. With a narrower window than (-inf, inf) a
+    # best_value at or outside alpha/beta is only a bound, see aspiration_search().
+    alpha_start, beta_start = alpha, beta
+    best_move = None
+    scores = material_scores(board)
+    if root_moves is None:
+        root_moves = list(board.legal_moves)
+    moves = order_moves(board, list(root_moves), 0, first_move)
+    if engine_color == chess.WHITE:
+        best_value = -float('inf')
+        #As in, set the best value to -infinity, so it can always find a better one
+        for index, move in enumerate(moves):
+            child_scores = push_scored(board, move, scores)
+            board_value = search_child(board, depth, alpha, beta, True, child_scores, 0, probe=index > 0)
+            #print("Testing Move:", move)
+            board.pop()
+            if board_value > best_value or best_move is None:
+                best_value = board_value
+                best_move = move
+            alpha = max(alpha, board_value)
+            if beta <= alpha:
+                break
+    else:
+        best_value = float('inf')
+        for index, move in enumerate(moves):
+            child_scores = push_scored(board, move, scores)
+            board_value = search_child(board, depth, alpha, beta, False, child_scores, 0, probe=index > 0)
+            #print("Testing Move:", move)
+            board.pop()
+            if board_value < best_value or best_move is None:
+                best_value = board_value
+                best_move = move
+            beta = min(beta, board_value)
+            if beta <= alpha:
+                break
+    if best_move is not None and inside_window(best_value, alpha_start, beta_start):
+        store_position(chess.polyglot.zobrist_hash(board), depth, best_value, TT_EXACT, best_move)
+    return best_move, best_value
+
+# Aspiration windows: from the second iteration on, the root is searched with a window of
+# ASPIRATION_WINDOW around the previous iteration's score instead of (-inf, inf), which prunes
+# more. If the score falls outside, that side of the window is widened (four times as far
+# each time) and the root searched again.
+USE_ASPIRATION = True
+ASPIRATION_WINDOW = 50
+
+def aspiration_search(board, engine_color, depth, first_move, root_moves, previous_value):
+    # search_root() inside an aspiration window around previous_value (None for no window)
+    if not USE_ASPIRATION or previous_value is None or abs(previous_value) >= tablebase.TABLEBASE_BOUND:
+        return search_root(board, engine_color, depth, first_move, root_moves)
+    delta = ASPIRATION_WINDOW
+    alpha, beta = previous_value - delta, previous_value + delta
+    while True:
+        best_move, best_value = search_root(board, engine_color, depth, first_move, root_moves, alpha, beta)
+        if inside_window(best_value, alpha, beta):
+            return best_move, best_value
+        if search_stats is not None:
+            search_stats["aspiration_researches"] += 1
+        delta *= 4
+        if best_value <= alpha:
+            alpha = best_value - delta if delta < tablebase.TABLEBASE_WIN else -float('inf')
+        else:
+            beta = best_value + delta if delta < tablebase.TABLEBASE_WIN else float('inf')
+            # The move that failed high is the one to try first
+            first_move = best_move
+
+def principal_variation(board, max_length):
+    # Follow the best moves stored in the transposition table from this position
+    pv = []
+    stack_size = len(board.move_stack)
+    while len(pv) < max_length:
+        entry = saved_positions.get(chess.polyglot.zobrist_hash(board))
+        if entry is None or entry[3] is None or entry[3] not in board.legal_moves:
+            break
+        pv.append(entry[3])
+        board.push(entry[3])
+    while len(board.move_stack) > stack_size:
+        board.pop()
+    return pv
+
+# Change depth=n to whatever you want below 
+def engine_move_choice(board, engine_color, depth=4, time_limit=None, node_limit=None, stop_event=None,
+                       on_iteration=None):
+    # Without a budget this searches straight to depth. With time_limit (seconds) and/or
+    # node_limit it deepens one ply at a time up to depth, and returns the best move of
+    # the last iteration that finished before the budget ran out.
+    # Setting stop_event (a threading.Event) from another thread ends the search the same way.
+    # on_iteration(depth, best_move, best_value, pv) is called after every finished iteration,
+    # and passing it also turns on iterative deepening.
+    global search_nodes, quiescence_nodes, search_deadline, search_node_limit, search_stop, search_stats
+    search_nodes = 0
+    quiescence_nodes = 0
+    if position_cache.cache_map is not None:
+        position_cache.set_fingerprint(engine_fingerprint())
+    # Book moves, endgames in the tables and positions searched before don't need a search
+    best_move = prepared_move(board) or cached_move(board, depth)
+    if best_move is not None:
+        if on_iteration is not None:
+            score = tablebase.probe_score(board)
+            if score is None:
+                score = evaluate_scores(board, material_scores(board))
+            on_iteration(1, best_move, score, [best_move])
+        return best_move
+    search_stats = new_search_stats() if stats_output is not None else None
+    completed_depth = 0
+    search_stop = stop_event
+    reset_move_ordering()
+    start_time = time.monotonic()
+    stack_size = len(board.move_stack)
+    root_moves = safe_root_moves(board)
+    try:
+        if time_limit is None and node_limit is None and on_iteration is None:
+            best_move, _ = search_root(board, engine_color, depth, root_moves=root_moves)
+            completed_depth = depth
+        else:
+            pv = []
+            best_value = None
+            for current_depth in range(1, depth + 1):
+                # The previous iteration's principal variation is tried first: its root move here,
+                # and the rest of it through the best moves saved in the transposition table
+                first_move = pv[0] if pv else None
+                best_move, best_value = aspiration_search(board, engine_color, current_depth, first_move, root_moves,
+                                                          best_value)
+                completed_depth = current_depth
+                pv = principal_variation(board, current_depth)
+                if on_iteration is not None:
+                    on_iteration(current_depth, best_move, best_value, pv)
+                if abs(best_value) == float('inf'):
+                    # Found a forced mate, searching deeper won't change the move
+                    break
+                # Depth 1 always finishes so there is a move to play, the budget applies after that
+                if time_limit is not None:
+                    search_deadline = start_time + time_limit
+                search_node_limit = node_limit
+    except SearchTimeout:
+        # The interrupted search left its moves on the board, take them back
+        while len(board.move_stack) > stack_size:
+            board.pop()
+    finally:
+        search_deadline = None
+        search_node_limit = None
+        search_stop = None
+    if search_stats is not None:
+        write_search_stats(board, completed_depth, best_move, time.monotonic() - start_time)
+        search_stats = None
+    if position_cache.cache_map is not None:
+        position_cache.store_positions((key, saved_positions[key]) for key in unsaved_keys if key in saved_positions)
+    unsaved_keys.clear()
+    if best_move is None:
+        best_move = random.choice(list(board.legal_moves))
+    return best_move
+
+# Root-parallel search. Each root move is searched in a worker process; moves are handed out
+# in order and each one gets the best score of the moves finished before it as its bound
+# (alpha for White, beta for Black), so later moves are cut off sooner.
+search_pool = None
+search_pool_workers = None
+
+def get_search_pool(workers=None):
+    # The pool is kept between moves, starting worker processes is slow
+    global search_pool, search_pool_workers
+    workers = workers or os.cpu_count() or 1
+    if search_pool is None or workers != search_pool_workers:
+        if search_pool is not None:
+            search_pool.shutdown(cancel_futures=True)
+        search_pool = ProcessPoolExecutor(max_workers=workers)
+        search_pool_workers = workers
+    return search_pool
+
+def search_root_move(board, move, depth, alpha, beta, seed, blindness_seed):
+    # Worker side of parallel_engine_move_choice(): search a single root move and return
+    # (score, nodes). Every task starts with an empty table and its own random seed, so the
+    # score only depends on the arguments, not on what else the worker process ran before.
+    global search_nodes, quiescence_nodes
+    random.seed(f"{seed}:{move.uci()}")
+    if blindness.blindness_seed != blindness_seed:
+        blindness.set_blindness_seed(blindness_seed)
+    if position_cache.cache_map is not None:
+        position_cache.set_fingerprint(engine_fingerprint())
+    saved_positions.clear()
+    unsaved_keys.clear()
+    reset_move_ordering(clear_history=True)
+    search_nodes = 0
+    quiescence_nodes = 0
+    child_scores = push_scored(board, move, material_scores(board))
+    value = minimax(board, depth - 1, alpha, beta, board.turn == chess.WHITE, child_scores)
+    return value, search_nodes + quiescence_nodes
+
+def parallel_engine_move_choice(board, engine_color, depth=4, workers=None, seed=None):
+    # Same result type as engine_move_choice(), but the root moves are spread over a
+    # ProcessPoolExecutor. Move i is only sent out after move i - workers has come back, and
+    # its bound is the best score among the moves already collected, so with a fixed seed and
+    # worker count the chosen move is always the same.
+    best_move = prepared_move(board)
+    if best_move is not None:
+        return best_move
+    if seed is None:
+        seed = random.getrandbits(32)
+    pool = get_search_pool(workers)
+    workers = search_pool_workers
+    # Deterministic root order: captures by MVV-LVA first, the rest in generation order
+    moves = order_moves(board, safe_root_moves(board), MAX_PLY, use_history=False)
+    maximizing = engine_color == chess.WHITE
+    best_move = None
+    best_value = -float('inf') if maximizing else float('inf')
+    in_flight = deque()
+
+    def collect():
+        nonlocal best_move, best_value
+        move, future = in_flight.popleft()
+        value, _ = future.result()
+        if best_move is None or (value > best_value if maximizing else value < best_value):
+            best_move = move
+            best_value = value
+
+    for index, move in enumerate(moves):
+        if index == 1:
+            # Young brothers wait: the first move, normally the best, gets a full window and
+            # the others wait for its score before they start
+            collect()
+        while len(in_flight) >= workers:
+            collect()
+        if maximizing:
+            alpha, beta = (best_value if best_move is not None else -float('inf')), float('inf')
+        else:
+            alpha, beta = -float('inf'), (best_value if best_move is not None else float('inf'))
+        in_flight.append((move, pool.submit(search_root_move, board, move, depth, alpha, beta, seed, blindness.blindness_seed)))
+    while in_flight:
+        collect()
+    if best_move is None:
+        best_move = random.choice(list(board.legal_moves))
+    else:
+        store_position(chess.polyglot.zobrist_hash(board), depth, best_value, TT_EXACT, best_move)
+    return best_move
+
+class BackgroundSearch:
+    # Runs engine_move_choice() on a copy of the board in a worker thread, so the window keeps
+    # repainting and handling events while the engine thinks. Poll done() every frame and read
+    # move once it is; cancel() stops the search and waits for the thread to finish.
+    # Only one search may run at a time, since the search tables are shared.
+    def __init__(self, board, color, depth, time_limit=None, node_limit=None, on_iteration=None):
+        self.board = board.copy()
+        self.move = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, args=(color, depth, time_limit, node_limit, on_iteration), daemon=True
+        )
+        self.thread.start()
+
+    def run(self, color, depth, time_limit, node_limit, on_iteration):
+        self.move = engine_move_choice(
+            self.board, color, depth, time_limit, node_limit, self.stop_event, on_iteration
+        )
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def cancel(self):
+        self.stop_event.set()
+        self.thread.join()
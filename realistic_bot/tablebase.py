@@ -0,0 +1,274 @@
+# Endgame tables for king + queen/rook/pawn against a lone king, built by retrograde analysis:
+#   python -m realistic_bot.make_tablebases
+# writes KQK.bin, KRK.bin and KPK.bin to TABLEBASE_DIR (about 0.5 MB each, a minute or so).
+# Probing is a single byte read from a memory-mapped file, so with the tables present the
+# search plays these endings instantly and perfectly. Without them probe() returns None and
+# the search carries on as before.
+#
+# Every table is stored from the point of view of the side with the extra piece (the "strong"
+# side) as White; positions where Black has it are mirrored top to bottom first. The byte for
+# ((strong_to_move * 64 + strong_king) * 64 + weak_king) * 64 + piece is 0 for a draw (or an
+# illegal position), otherwise 1 + the number of plies until the strong side mates.
+#
+# Four piece tables would be 64 times the size and work; generating them in pure Python is
+# too slow to be worth it here.
+import mmap
+import os
+import sys
+from array import array
+
+import chess
+
+TABLEBASE_DIR = os.environ.get("REALISTIC_BOT_TABLEBASES", os.path.join(os.path.dirname(__file__), "tablebases"))
+# Tables in the order they are generated, KPK needs the other two for its promotions
+TABLES = {"KQK": chess.QUEEN, "KRK": chess.ROOK, "KPK": chess.PAWN}
+TABLE_SIZE = 2 * 64 * 64 * 64
+STRONG_TO_MOVE = 0
+WEAK_TO_MOVE = 1
+
+def table_index(to_move, strong_king, weak_king, piece):
+    return ((to_move * 64 + strong_king) * 64 + weak_king) * 64 + piece
+
+KING_MOVES = [list(chess.SquareSet(chess.BB_KING_ATTACKS[square])) for square in chess.SQUARES]
+KING_NEAR = [chess.BB_KING_ATTACKS[square] for square in chess.SQUARES]
+DIRECTIONS = {
+    chess.ROOK: [(1, 0), (-1, 0), (0, 1), (0, -1)],
+    chess.QUEEN: [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)],
+}
+
+def build_rays(directions):
+    # rays[square] = the squares in each direction, nearest first
+    rays = []
+    for square in chess.SQUARES:
+        square_rays = []
+        for file_step, rank_step in directions:
+            ray = []
+            file, rank = chess.square_file(square) + file_step, chess.square_rank(square) + rank_step
+            while 0 <= file < 8 and 0 <= rank < 8:
+                ray.append(chess.square(file, rank))
+                file, rank = file + file_step, rank + rank_step
+            square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+RAYS = {piece_type: build_rays(directions) for piece_type, directions in DIRECTIONS.items()}
+
+def build_lines(piece_type):
+    # lines[from * 64 + to] = bitboard of the squares in between if the piece moves along
+    # that line, -1 if it can't reach to from from on an empty board
+    lines = [-1] * (64 * 64)
+    for square in chess.SQUARES:
+        for ray in RAYS[piece_type][square]:
+            between = 0
+            for target in ray:
+                lines[square * 64 + target] = between
+                between |= chess.BB_SQUARES[target]
+    return lines
+
+LINES = {piece_type: build_lines(piece_type) for piece_type in RAYS}
+
+def attacks(piece_type, piece, target, blocker):
+    # Does the strong side's piece attack target, with only the strong king (on blocker) in the way
+    if piece_type == chess.PAWN:
+        return bool(chess.BB_PAWN_ATTACKS[chess.WHITE][piece] & chess.BB_SQUARES[target])
+    between = LINES[piece_type][piece * 64 + target]
+    return between != -1 and not between & chess.BB_SQUARES[blocker]
+
+def is_legal(piece_type, to_move, strong_king, weak_king, piece):
+    if strong_king == weak_king or piece in (strong_king, weak_king):
+        return False
+    if KING_NEAR[strong_king] & chess.BB_SQUARES[weak_king]:
+        return False
+    if piece_type == chess.PAWN and not chess.BB_SQUARES[piece] & ~chess.BB_BACKRANKS:
+        return False
+    # The side that just moved can't be left in check
+    return to_move == WEAK_TO_MOVE or not attacks(piece_type, piece, weak_king, strong_king)
+
+def weak_king_moves(piece_type, strong_king, weak_king, piece):
+    # (squares the weak king can move to, whether one of its moves captures the piece)
+    targets = []
+    captures = False
+    for target in KING_MOVES[weak_king]:
+        if target == strong_king or KING_NEAR[strong_king] & chess.BB_SQUARES[target]:
+            continue
+        if target == piece:
+            captures = True
+        elif not attacks(piece_type, piece, target, strong_king):
+            targets.append(target)
+    return targets, captures
+
+def strong_predecessors(piece_type, strong_king, weak_king, piece):
+    # Strong-to-move positions that lead to this weak-to-move one with a strong move
+    occupied = chess.BB_SQUARES[strong_king] | chess.BB_SQUARES[weak_king] | chess.BB_SQUARES[piece]
+    for square in KING_MOVES[strong_king]:
+        if occupied & chess.BB_SQUARES[square] or KING_NEAR[weak_king] & chess.BB_SQUARES[square]:
+            continue
+        if not attacks(piece_type, piece, weak_king, square):
+            yield table_index(STRONG_TO_MOVE, square, weak_king, piece)
+    if piece_type == chess.PAWN:
+        origins = []
+        if piece >= chess.A3 and not occupied & chess.BB_SQUARES[piece - 8]:
+            origins.append(piece - 8)
+            if chess.square_rank(piece) == 3 and not occupied & chess.BB_SQUARES[piece - 16]:
+                origins.append(piece - 16)
+    else:
+        origins = []
+        for ray in RAYS[piece_type][piece]:
+            for square in ray:
+                if occupied & chess.BB_SQUARES[square]:
+                    break
+                origins.append(square)
+    for square in origins:
+        if not attacks(piece_type, square, weak_king, strong_king):
+            yield table_index(STRONG_TO_MOVE, strong_king, weak_king, square)
+
+def weak_predecessors(piece_type, strong_king, weak_king, piece):
+    # Weak-to-move positions that lead to this strong-to-move one with a king move
+    for square in KING_MOVES[weak_king]:
+        if square == strong_king or square == piece or KING_NEAR[strong_king] & chess.BB_SQUARES[square]:
+            continue
+        yield table_index(WEAK_TO_MOVE, strong_king, square, piece)
+
+def promotion_levels(strong_king, weak_king, piece, tables):
+    # KPK positions with the strong side to move: plies to mate through each winning promotion
+    target = piece + 8
+    if chess.square_rank(piece) != 6 or target in (strong_king, weak_king):
+        return []
+    levels = []
+    for name in ("KQK", "KRK"):
+        value = tables[name][table_index(WEAK_TO_MOVE, strong_king, weak_king, target)]
+        if value:
+            levels.append(value)
+    return levels
+
+def generate_table(piece_type, tables):
+    # Retrograde analysis: start from the checkmates and walk backwards one ply at a time.
+    # A strong-to-move position is won as soon as one move leads to a lost position, a
+    # weak-to-move one is lost once every move does (counted down in moves_left).
+    values = bytearray(TABLE_SIZE)
+    moves_left = array("b", bytes(TABLE_SIZE // 2))
+    buckets = {}
+    for strong_king in chess.SQUARES:
+        for weak_king in chess.SQUARES:
+            for piece in chess.SQUARES:
+                if not is_legal(piece_type, WEAK_TO_MOVE, strong_king, weak_king, piece):
+                    continue
+                targets, captures = weak_king_moves(piece_type, strong_king, weak_king, piece)
+                index = table_index(WEAK_TO_MOVE, strong_king, weak_king, piece)
+                moves_left[index - TABLE_SIZE // 2] = len(targets) + captures
+                if not targets and not captures and attacks(piece_type, piece, weak_king, strong_king):
+                    buckets.setdefault(0, []).append(index)
+                if piece_type == chess.PAWN and is_legal(piece_type, STRONG_TO_MOVE, strong_king, weak_king, piece):
+                    for level in promotion_levels(strong_king, weak_king, piece, tables):
+                        buckets.setdefault(level, []).append(table_index(STRONG_TO_MOVE, strong_king, weak_king, piece))
+    level = 0
+    while buckets:
+        for index in buckets.pop(level, []):
+            if values[index]:
+                continue
+            values[index] = level + 1
+            to_move, rest = divmod(index, 64 * 64 * 64)
+            strong_king, rest = divmod(rest, 64 * 64)
+            weak_king, piece = divmod(rest, 64)
+            if to_move == WEAK_TO_MOVE:
+                for previous in strong_predecessors(piece_type, strong_king, weak_king, piece):
+                    if not values[previous]:
+                        buckets.setdefault(level + 1, []).append(previous)
+            else:
+                for previous in weak_predecessors(piece_type, strong_king, weak_king, piece):
+                    if not values[previous]:
+                        moves_left[previous - TABLE_SIZE // 2] -= 1
+                        if moves_left[previous - TABLE_SIZE // 2] == 0:
+                            buckets.setdefault(level + 1, []).append(previous)
+        level += 1
+    return values
+
+def generate_tables(directory=TABLEBASE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    for name, piece_type in TABLES.items():
+        tables[name] = generate_table(piece_type, tables)
+        with open(os.path.join(directory, name + ".bin"), "wb") as f:
+            f.write(tables[name])
+        print(f"{name}: longest win {max(tables[name]) - 1} plies", file=sys.stderr)
+    loaded_tables.clear()
+
+# Probing. Tables are opened on first use, a missing file is remembered as None.
+loaded_tables = {}
+
+def load_table(name):
+    if name not in loaded_tables:
+        path = os.path.join(TABLEBASE_DIR, name + ".bin")
+        try:
+            with open(path, "rb") as f:
+                loaded_tables[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            loaded_tables[name] = None
+    return loaded_tables[name]
+
+def probe(board):
+    # (wdl, plies) for the side to move: wdl is 1 for a win, 0 for a draw and -1 for a loss,
+    # plies is how long until mate. None if the position isn't covered by a loaded table.
+    if board.is_insufficient_material():
+        return 0, 0
+    if chess.popcount(board.occupied) != 3 or board.castling_rights:
+        return None
+    piece_type = None
+    for name, table_piece in TABLES.items():
+        if board.pieces_mask(table_piece, chess.WHITE) | board.pieces_mask(table_piece, chess.BLACK):
+            piece_type = table_piece
+            break
+    if piece_type is None:
+        return None
+    table = load_table(name)
+    if table is None:
+        return None
+    strong = chess.WHITE if board.pieces_mask(piece_type, chess.WHITE) else chess.BLACK
+    flip = 0 if strong == chess.WHITE else 56
+    index = table_index(
+        STRONG_TO_MOVE if board.turn == strong else WEAK_TO_MOVE,
+        board.king(strong) ^ flip,
+        board.king(not strong) ^ flip,
+        chess.lsb(board.pieces_mask(piece_type, strong)) ^ flip,
+    )
+    value = table[index]
+    if not value:
+        return 0, 0
+    return (1 if board.turn == strong else -1), value - 1
+
+# Won positions are scored below real mates (which are +-inf) but above any material count,
+# and the quicker the mate the higher the score
+TABLEBASE_WIN = 100000
+# Scores further from 0 than this are tablebase results, TABLEBASE_WIN - abs(score) plies from mate
+TABLEBASE_BOUND = TABLEBASE_WIN - 1000
+
+def probe_score(board, ply=0):
+    # The tablebase result as a search score from White's point of view, or None. ply is how
+    # far board is from the root of the search: plies to mate are counted from the root, so
+    # probes at different depths compare correctly and the quicker mate still scores higher.
+    result = probe(board)
+    if result is None:
+        return None
+    wdl, plies = result
+    score = wdl * (TABLEBASE_WIN - plies - ply)
+    return score if board.turn == chess.WHITE else -score
+
+def best_move(board):
+    # The move that wins fastest, draws, or loses slowest. None if the position isn't covered.
+    if probe(board) is None:
+        return None
+    best = None
+    best_key = None
+    for move in board.legal_moves:
+        board.push(move)
+        result = probe(board)
+        board.pop()
+        if result is None:
+            return None
+        wdl, plies = result
+        # The child is from the opponent's side: their loss is our win
+        key = (-wdl, -plies if wdl == -1 else plies)
+        if best_key is None or key > best_key:
+            best = move
+            best_key = key
+    return best
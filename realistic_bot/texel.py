@@ -0,0 +1,202 @@
+# Texel tuning: fits the evaluation's piece values and piece-square tables to game results.
+#   python -m realistic_bot.tune_tables extract games.pgn --output positions.bin
+#   python -m realistic_bot.tune_tables fit positions.bin --output realistic_bot/tables.json
+# Extraction streams the games and keeps the quiet positions (not in check, and the quiescence
+# search agrees with the static score), each stored as the list of table entries its pieces
+# use plus the game's result, in a flat binary file of fixed-size records. Fitting memory-maps
+# that file and minimizes the squared error between sigmoid(scale * score) and the result
+# (1, 0.5 or 0 for White) with Adam, one batch of positions at a time, so millions of
+# positions only take as much memory as a batch. The result is a tables file that
+# evaluation.py loads on import.
+#
+# The score is linear in the parameters: every piece adds (White) or subtracts (Black)
+# 1.5 * its piece value + its table entry for its square. Values and tables can trade off
+# against each other, the regularization towards the starting values decides how.
+# NumPy is optional like in batch_eval.py, only tuning needs it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import chess
+import chess.pgn
+
+from . import evaluation, search
+from .evaluation import PIECE_NAMES, PIECE_VALUES, QUEEN_OPENING_HALFMOVES, TABLES, evaluate_scores, material_scores
+
+# Parameter layout: the tables in this order, 64 squares each
+TABLE_NAMES = list(TABLES)
+TABLE_PIECES = {"pawn": chess.PAWN, "knight": chess.KNIGHT, "bishop": chess.BISHOP, "rook": chess.ROOK,
+                "queen_opening": chess.QUEEN, "queen": chess.QUEEN, "king": chess.KING}
+NUM_FEATURES = len(TABLE_NAMES) * 64
+# A record's features are table entries, White's as they are and Black's offset by
+# NUM_FEATURES; unused slots hold PADDING, which scores 0
+PADDING = 2 * NUM_FEATURES
+MAX_PIECES = 32
+# Piece values that are tuned, the kings always cancel out
+TUNED_PIECES = [chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN]
+POSITION_DTYPE = np.dtype([("features", np.uint16, (MAX_PIECES,)), ("result", np.uint8)]) if np is not None else None
+# Result of a game for White, stored as twice the score
+RESULTS = {"1-0": 2, "1/2-1/2": 1, "0-1": 0}
+
+# Extraction
+# The first plies of a game are mostly book moves and say little about the evaluation
+SKIP_PLIES = 8
+# A position is quiet if the quiescence search changes its score by less than this
+QUIET_MARGIN = 1
+# Records written to the file at a time
+CHUNK_POSITIONS = 65536
+
+def position_features(board):
+    opening = board.halfmove_clock <= QUEEN_OPENING_HALFMOVES
+    features = []
+    for square, piece in board.piece_map().items():
+        name = PIECE_NAMES[piece.piece_type]
+        if piece.piece_type == chess.QUEEN and opening:
+            name = "queen_opening"
+        feature = TABLE_NAMES.index(name) * 64 + square
+        features.append(feature if piece.color == chess.WHITE else feature + NUM_FEATURES)
+    return features
+
+def is_quiet(board):
+    if board.is_check():
+        return False
+    scores = material_scores(board)
+    static = evaluate_scores(board, scores, True)
+    settled = search.quiescence(board, -float('inf'), float('inf'), board.turn == chess.WHITE, scores)
+    return abs(settled - static) < QUIET_MARGIN
+
+def game_positions(game):
+    # (features, result) for the quiet positions of a finished game
+    result = RESULTS.get(game.headers.get("Result"))
+    if result is None:
+        return
+    board = game.board()
+    for move in game.mainline_moves():
+        if board.ply() >= SKIP_PLIES and is_quiet(board):
+            yield position_features(board), result
+        board.push(move)
+
+def extract_positions(pgn_paths, output_path, max_positions=None):
+    # Streams the games into output_path, returns (games, positions)
+    if np is None:
+        raise ImportError("tuning needs numpy")
+    chunk = np.zeros(CHUNK_POSITIONS, dtype=POSITION_DTYPE)
+    games = positions = filled = 0
+    with open(output_path, "wb") as output:
+        for path in pgn_paths:
+            with open(path, encoding="utf-8", errors="replace") as pgn:
+                while max_positions is None or positions < max_positions:
+                    game = chess.pgn.read_game(pgn)
+                    if game is None:
+                        break
+                    games += 1
+                    for features, result in game_positions(game):
+                        chunk["features"][filled] = PADDING
+                        chunk["features"][filled, :len(features)] = features
+                        chunk["result"][filled] = result
+                        filled += 1
+                        positions += 1
+                        if filled == CHUNK_POSITIONS:
+                            chunk.tofile(output)
+                            filled = 0
+        chunk[:filled].tofile(output)
+    return games, positions
+
+# Fitting
+def load_positions(path):
+    return np.memmap(path, dtype=POSITION_DTYPE, mode="r")
+
+def initial_parameters():
+    # (piece values of TUNED_PIECES, tables flattened in TABLE_NAMES order) as now in use
+    values = np.array([PIECE_VALUES[piece_type] for piece_type in TUNED_PIECES], dtype=np.float64)
+    tables = np.array([TABLES[name] for name in TABLE_NAMES], dtype=np.float64).reshape(-1)
+    return values, tables
+
+# FEATURE_PIECES[i] is the index in TUNED_PIECES of feature i's piece, -1 for the king
+FEATURE_PIECES = np.repeat([TUNED_PIECES.index(TABLE_PIECES[name]) if TABLE_PIECES[name] in TUNED_PIECES else -1
+                            for name in TABLE_NAMES], 64) if np is not None else None
+
+def feature_scores(values, tables):
+    # What each feature adds to the score: 1.5 * piece value + table entry
+    material = np.where(FEATURE_PIECES >= 0, 1.5 * values[FEATURE_PIECES], 0.0)
+    return material + tables
+
+def evaluate_features(scores, features):
+    # Scores of a batch of records' features, from the per-feature scores
+    signed = np.concatenate([scores, -scores, [0.0]])
+    return signed[features].sum(axis=1)
+
+def feature_gradient(features, d_scores):
+    # Gradient of the sum of d_scores[i] * score of record i with respect to each feature score
+    counts = np.bincount(features.reshape(-1), weights=np.repeat(d_scores, features.shape[1]), minlength=PADDING + 1)
+    return counts[:NUM_FEATURES] - counts[NUM_FEATURES:PADDING]
+
+def batch_loss(scores, batch, scale):
+    features = np.asarray(batch["features"])
+    results = np.asarray(batch["result"]) / 2
+    predicted = 1 / (1 + np.exp(-scale * evaluate_features(scores, features)))
+    return features, results, predicted
+
+def mean_loss(positions, scores, scale, batch_size=65536):
+    total = 0.0
+    for start in range(0, len(positions), batch_size):
+        _, results, predicted = batch_loss(scores, positions[start:start + batch_size], scale)
+        total += np.sum((predicted - results) ** 2)
+    return total / max(1, len(positions))
+
+def fit_scale(positions, scores, sample=1_000_000):
+    # The scale that best turns the current scores into results, found by ternary search on
+    # its logarithm. It is fitted once and then kept fixed, so the tables can't just shrink.
+    sample = positions[:sample]
+    low, high = -5.0, -1.0
+    for _ in range(40):
+        first, second = low + (high - low) / 3, high - (high - low) / 3
+        if mean_loss(sample, scores, 10 ** first) < mean_loss(sample, scores, 10 ** second):
+            high = second
+        else:
+            low = first
+    return 10 ** ((low + high) / 2)
+
+def tune(positions, scale, epochs=10, batch_size=16384, learning_rate=1.0, regularization=1e-6, seed=0,
+         on_epoch=None):
+    # Adam over batches of consecutive records, in a new random order every epoch. Returns the
+    # tuned (values, tables). on_epoch(epoch, loss) gets each epoch's mean training loss.
+    start_parameters = np.concatenate(initial_parameters())
+    parameters = start_parameters.copy()
+    first_moment = np.zeros_like(parameters)
+    second_moment = np.zeros_like(parameters)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    has_value = FEATURE_PIECES >= 0
+    starts = np.arange(0, len(positions), batch_size)
+    rng = np.random.default_rng(seed)
+    step = 0
+    for epoch in range(epochs):
+        total = 0.0
+        for start in rng.permutation(starts):
+            batch = positions[start:start + batch_size]
+            values, tables = parameters[:len(TUNED_PIECES)], parameters[len(TUNED_PIECES):]
+            features, results, predicted = batch_loss(feature_scores(values, tables), batch, scale)
+            total += np.sum((predicted - results) ** 2)
+            d_scores = 2 * (predicted - results) * predicted * (1 - predicted) * scale / len(batch)
+            table_gradient = feature_gradient(features, d_scores)
+            # A piece value moves every entry of its tables at once
+            value_gradient = 1.5 * np.bincount(FEATURE_PIECES[has_value], weights=table_gradient[has_value],
+                                               minlength=len(TUNED_PIECES))
+            gradient = np.concatenate([value_gradient, table_gradient])
+            gradient += regularization * (parameters - start_parameters)
+            step += 1
+            first_moment = beta1 * first_moment + (1 - beta1) * gradient
+            second_moment = beta2 * second_moment + (1 - beta2) * gradient ** 2
+            corrected_first = first_moment / (1 - beta1 ** step)
+            corrected_second = second_moment / (1 - beta2 ** step)
+            parameters = parameters - learning_rate * corrected_first / (np.sqrt(corrected_second) + epsilon)
+        if on_epoch is not None:
+            on_epoch(epoch + 1, total / max(1, len(positions)))
+    return parameters[:len(TUNED_PIECES)], parameters[len(TUNED_PIECES):]
+
+def write_tuned_tables(path, values, tables):
+    # Rounded to whole numbers like the hand-made tables
+    piece_values = {piece_type: int(round(value)) for piece_type, value in zip(TUNED_PIECES, values)}
+    table_rows = tables.reshape(len(TABLE_NAMES), 64)
+    evaluation.write_tables(path, piece_values, {name: [int(round(v)) for v in row] for name, row in zip(TABLE_NAMES, table_rows)})
@@ -0,0 +1,57 @@
+# Tunes the evaluation's piece values and piece-square tables on PGN games, see texel.py:
+#   python -m realistic_bot.tune_tables extract games.pgn more_games.pgn --output positions.bin
+#   python -m realistic_bot.tune_tables fit positions.bin --output realistic_bot/tables.json
+import argparse
+import sys
+import time
+
+from . import evaluation, texel
+
+def extract(args):
+    start = time.monotonic()
+    games, positions = texel.extract_positions(args.pgn, args.output, args.max_positions)
+    print(f"{games} games, {positions} quiet positions written to {args.output} "
+          f"in {time.monotonic() - start:.1f}s", file=sys.stderr)
+
+def fit(args):
+    positions = texel.load_positions(args.positions)
+    scores = texel.feature_scores(*texel.initial_parameters())
+    scale = args.scale or texel.fit_scale(positions, scores)
+    print(f"{len(positions)} positions, scale {scale:.6f}, "
+          f"loss {texel.mean_loss(positions, scores, scale):.6f} with the current tables", file=sys.stderr)
+
+    def report(epoch, loss):
+        print(f"epoch {epoch}: loss {loss:.6f}", file=sys.stderr)
+
+    values, tables = texel.tune(positions, scale, args.epochs, args.batch_size, args.learning_rate,
+                                args.regularization, on_epoch=report)
+    loss = texel.mean_loss(positions, texel.feature_scores(values, tables), scale)
+    texel.write_tuned_tables(args.output, values, tables)
+    print(f"loss {loss:.6f} with the tuned tables, written to {args.output}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the evaluation tables on game results.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = commands.add_parser("extract", help="collect quiet positions from PGN files")
+    extract_parser.add_argument("pgn", nargs="+")
+    extract_parser.add_argument("-o", "--output", required=True)
+    extract_parser.add_argument("--max-positions", type=int, default=None)
+    extract_parser.set_defaults(run=extract)
+
+    fit_parser = commands.add_parser("fit", help="fit the tables to extracted positions")
+    fit_parser.add_argument("positions")
+    fit_parser.add_argument("-o", "--output", default=evaluation.TABLES_PATH)
+    fit_parser.add_argument("--epochs", type=int, default=10)
+    fit_parser.add_argument("--batch-size", type=int, default=16384)
+    fit_parser.add_argument("--learning-rate", type=float, default=1.0, help="Adam step size, in score units")
+    fit_parser.add_argument("--regularization", type=float, default=1e-6,
+                            help="pull towards the current values, against overfitting small game sets")
+    fit_parser.add_argument("--scale", type=float, default=None, help="sigmoid scale (default: fitted)")
+    fit_parser.set_defaults(run=fit)
+
+    args = parser.parse_args()
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# UCI front end, so the bot can be driven by chess GUIs and match runners:
+#   python -m realistic_bot
+# Supports position, go (depth/nodes/movetime/wtime/btime/infinite), stop, setoption (Hash,
+# NullMove, LMR), ucinewgame, isready and quit. Searches run in a background thread, so stop works mid-search.
+import sys
+import threading
+import time
+
+import chess
+
+from . import search, tablebase
+
+ENGINE_NAME = "realistic-chess-bot"
+ENGINE_AUTHOR = "taplank"
+# Deepest iteration a search will go to when the go command doesn't give a depth
+MAX_DEPTH = 32
+# With a clock and no movestogo, assume this many moves are left in the game
+DEFAULT_MOVES_TO_GO = 30
+
+def format_score(board, value, pv):
+    # Search scores are from White's point of view, UCI wants the side to move's
+    if value == float('inf') or value == -float('inf'):
+        moves_to_mate = (len(pv) + 1) // 2
+        side_wins = (value > 0) == (board.turn == chess.WHITE)
+        return f"mate {moves_to_mate if side_wins else -moves_to_mate}"
+    if abs(value) > tablebase.TABLEBASE_BOUND:
+        # A tablebase win, which knows how many plies from this position are left until mate
+        plies = tablebase.TABLEBASE_WIN - abs(value)
+        side_wins = (value > 0) == (board.turn == chess.WHITE)
+        return f"mate {(plies + 1) // 2 if side_wins else -((plies + 1) // 2)}"
+    return f"cp {int(value) if board.turn == chess.WHITE else -int(value)}"
+
+def parse_go(board, tokens):
+    # Returns (depth, time_limit, node_limit, infinite) for a go command
+    args = {}
+    infinite = False
+    i = 0
+    while i < len(tokens):
+        if tokens[i] == "infinite":
+            infinite = True
+            i += 1
+        elif tokens[i] in ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo") and i + 1 < len(tokens):
+            args[tokens[i]] = int(tokens[i + 1])
+            i += 2
+        else:
+            i += 1
+    depth = args.get("depth", MAX_DEPTH)
+    node_limit = args.get("nodes")
+    time_limit = None
+    if "movetime" in args:
+        time_limit = args["movetime"] / 1000
+    else:
+        remaining = args.get("wtime" if board.turn == chess.WHITE else "btime")
+        increment = args.get("winc" if board.turn == chess.WHITE else "binc", 0)
+        if remaining is not None:
+            moves_to_go = args.get("movestogo", DEFAULT_MOVES_TO_GO)
+            budget = remaining / moves_to_go + increment * 0.8
+            # Never plan to use more than half of what is left on the clock
+            time_limit = max(10, min(budget, remaining / 2)) / 1000
+    if not args and not infinite:
+        # A bare "go" searches until told to stop
+        infinite = True
+    return depth, time_limit, node_limit, infinite
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.board = chess.Board()
+        self.search = None
+        self.reporter = None
+
+    def send(self, line):
+        print(line, file=self.output, flush=True)
+
+    def handle(self, line):
+        # Handle one line of input, returns False once the engine should exit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {search.TT_SIZE_MB} min 1 max 4096")
+            self.send(f"option name NullMove type check default {str(search.USE_NULL_MOVE).lower()}")
+            self.send(f"option name LMR type check default {str(search.USE_LMR).lower()}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.set_option(tokens[1:])
+        elif command == "ucinewgame":
+            self.stop()
+            search.saved_positions.clear()
+            self.board = chess.Board()
+        elif command == "position":
+            self.stop()
+            self.set_position(tokens[1:])
+        elif command == "go":
+            self.go(tokens[1:])
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, tokens):
+        # setoption name <name> value <value>
+        if "name" not in tokens or "value" not in tokens:
+            return
+        name = " ".join(tokens[tokens.index("name") + 1:tokens.index("value")]).lower()
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name == "hash":
+            try:
+                megabytes = int(value)
+            except ValueError:
+                self.send(f"info string bad Hash value {value!r}, keeping the current size")
+                return
+            search.set_tt_size(megabytes)
+        elif name == "nullmove":
+            search.USE_NULL_MOVE = value.lower() == "true"
+        elif name == "lmr":
+            search.USE_LMR = value.lower() == "true"
+
+    def set_position(self, tokens):
+        if not tokens:
+            return
+        if tokens[0] == "startpos":
+            board = chess.Board()
+            rest = tokens[1:]
+        elif tokens[0] == "fen":
+            end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            try:
+                board = chess.Board(" ".join(tokens[1:end]))
+            except ValueError as error:
+                self.send(f"info string bad position, keeping the previous one: {error}")
+                return
+            rest = tokens[end:]
+        else:
+            return
+        if rest and rest[0] == "moves":
+            # An illegal move (IllegalMoveError is a ValueError) leaves the previous position
+            for uci in rest[1:]:
+                try:
+                    board.push_uci(uci)
+                except ValueError as error:
+                    self.send(f"info string bad move, keeping the previous position: {error}")
+                    return
+        self.board = board
+
+    def go(self, tokens):
+        self.stop()
+        if self.board.is_game_over():
+            self.send("bestmove 0000")
+            return
+        depth, time_limit, node_limit, infinite = parse_go(self.board, tokens)
+        board = self.board.copy()
+        start_time = time.monotonic()
+
+        def report(current_depth, best_move, best_value, pv):
+            elapsed = max(time.monotonic() - start_time, 1e-6)
+            nodes = search.search_nodes + search.quiescence_nodes
+            self.send(
+                f"info depth {current_depth} score {format_score(board, best_value, pv)} nodes {nodes} "
+                f"nps {int(nodes / elapsed)} time {int(elapsed * 1000)} pv {' '.join(move.uci() for move in pv)}"
+            )
+
+        self.search = search.BackgroundSearch(board, board.turn, depth, time_limit, node_limit, on_iteration=report)
+        self.reporter = threading.Thread(target=self.report_bestmove, args=(self.search, infinite), daemon=True)
+        self.reporter.start()
+
+    def report_bestmove(self, background, infinite):
+        background.thread.join()
+        if infinite:
+            # In infinite mode bestmove may only be sent after stop, even if the search ended early
+            background.stop_event.wait()
+        self.send(f"bestmove {background.move.uci()}")
+
+    def stop(self):
+        if self.search is not None:
+            self.search.stop_event.set()
+            self.reporter.join()
+            self.search = None
+            self.reporter = None
+
+def main():
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
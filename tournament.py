@@ -0,0 +1,158 @@
+# Headless self-play harness for the three bots. Plays games in parallel worker processes
+# from a fixed set of start positions and seeds, then reports win/draw/loss, the estimated
+# Elo difference, nodes per second and per-move latency. For example:
+#   python tournament.py minimax random --games 1000 --workers 8 --depth 3
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chess
+
+import complex_chess
+import simple_chess_engine
+from realistic_bot import blindness, search
+from realistic_bot.latency import percentile
+from realistic_bot.positions import START_POSITIONS
+
+# Games that go on this long are scored as a draw
+MAX_PLIES = 300
+
+# Each player takes the board and the search options and returns (move, nodes searched)
+def random_player(board, options):
+    return complex_chess.engine_move_choice(board), 0
+
+def safe_random_player(board, options):
+    # random_move_modified() works on SAN strings
+    san_moves = [board.san(move) for move in board.legal_moves]
+    return board.parse_san(simple_chess_engine.random_move_modified(board, san_moves)), 0
+
+def minimax_player(board, options):
+    move = search.engine_move_choice(
+        board, board.turn, depth=options["depth"],
+        time_limit=options["movetime"], node_limit=options["nodes"],
+    )
+    return move, search.search_nodes + search.quiescence_nodes
+
+PLAYERS = {
+    "random": random_player,
+    "safe_random": safe_random_player,
+    "minimax": minimax_player,
+}
+
+def play_game(game):
+    # Runs in a worker process. game is (index, fen, engines, first_is_white, seed, options),
+    # and the result only depends on it: the random state and the search tables are reset first.
+    # Stats are kept per engine slot (0 = first engine), so an engine can play itself.
+    index, fen, engines, first_is_white, seed, options = game
+    random.seed(seed)
+    blindness.set_blindness_seed(seed)
+    search.saved_positions.clear()
+    search.reset_move_ordering(clear_history=True)
+    board = chess.Board(fen)
+    stats = [{"times": [], "nodes": 0}, {"times": [], "nodes": 0}]
+    while not board.is_game_over() and board.ply() < MAX_PLIES:
+        slot = 0 if (board.turn == chess.WHITE) == first_is_white else 1
+        start = time.perf_counter()
+        move, nodes = PLAYERS[engines[slot]](board, options)
+        stats[slot]["times"].append(time.perf_counter() - start)
+        stats[slot]["nodes"] += nodes
+        board.push(move)
+    result = board.result() if board.is_game_over() else "1/2-1/2"
+    return index, first_is_white, result, stats
+
+def make_games(first, second, games, seed, options):
+    # Every start position is played twice per seed, once with each engine as White
+    schedule = []
+    for index in range(games):
+        pair = index // 2
+        fen = START_POSITIONS[pair % len(START_POSITIONS)]
+        game_seed = seed + pair // len(START_POSITIONS)
+        schedule.append((index, fen, (first, second), index % 2 == 0, game_seed, options))
+    return schedule
+
+def elo_from_score(score):
+    if score <= 0:
+        return -float('inf')
+    if score >= 1:
+        return float('inf')
+    return -400 * math.log10(1 / score - 1)
+
+def elo_difference(wins, draws, losses):
+    # Elo difference of the first engine, with a 95% error margin from the score's spread
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    if score in (0, 1):
+        return elo_from_score(score), float('inf')
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    low, high = elo_from_score(score - margin), elo_from_score(score + margin)
+    return elo_from_score(score), (high - low) / 2
+
+def summarize(first, second, results):
+    wins = draws = losses = 0
+    times = [[], []]
+    nodes = [0, 0]
+    for _, first_is_white, result, stats in results:
+        if result == "1/2-1/2":
+            draws += 1
+        elif (result == "1-0") == first_is_white:
+            wins += 1
+        else:
+            losses += 1
+        for slot in (0, 1):
+            times[slot] += stats[slot]["times"]
+            nodes[slot] += stats[slot]["nodes"]
+    elo, margin = elo_difference(wins, draws, losses)
+    summary = {"engines": [first, second], "games": len(results), "wins": wins, "draws": draws,
+               "losses": losses, "elo": elo, "elo_margin": margin, "engine_stats": []}
+    for slot, name in enumerate((first, second)):
+        total_time = sum(times[slot])
+        summary["engine_stats"].append({
+            "engine": name,
+            "moves": len(times[slot]),
+            "nps": nodes[slot] / total_time if total_time else 0.0,
+            "latency_p50": percentile(times[slot], 0.5),
+            "latency_p90": percentile(times[slot], 0.9),
+            "latency_p99": percentile(times[slot], 0.99),
+            "latency_max": max(times[slot], default=0.0),
+        })
+    return summary
+
+def print_summary(summary):
+    first, second = summary["engines"]
+    print(f"{first} vs {second}: {summary['games']} games, "
+          f"+{summary['wins']} ={summary['draws']} -{summary['losses']}")
+    print(f"Elo difference: {summary['elo']:+.1f} +/- {summary['elo_margin']:.1f}")
+    for stats in summary["engine_stats"]:
+        print(f"{stats['engine']}: {stats['moves']} moves, {stats['nps']:.0f} nodes/s, latency "
+              f"p50 {stats['latency_p50'] * 1000:.1f}ms p90 {stats['latency_p90'] * 1000:.1f}ms "
+              f"p99 {stats['latency_p99'] * 1000:.1f}ms max {stats['latency_max'] * 1000:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the bots against each other.")
+    parser.add_argument("first", choices=PLAYERS)
+    parser.add_argument("second", choices=PLAYERS)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=3, help="minimax search depth")
+    parser.add_argument("--movetime", type=float, default=None, help="minimax seconds per move")
+    parser.add_argument("--nodes", type=int, default=None, help="minimax nodes per move")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    options = {"depth": args.depth, "movetime": args.movetime, "nodes": args.nodes}
+    games = make_games(args.first, args.second, args.games, args.seed, options)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(play_game, games, chunksize=4))
+    summary = summarize(args.first, args.second, results)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()